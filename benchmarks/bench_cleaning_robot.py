@@ -0,0 +1,217 @@
+"""
+Benchmarks of the CleaningRobot command-execution hot path.
+
+Run from the repository root:
+    python -m benchmarks.bench_cleaning_robot                         # compare with the stored baseline
+    python -m benchmarks.bench_cleaning_robot --save-baseline         # store a new baseline
+    python -m benchmarks.bench_cleaning_robot --fail-on-regression    # exit with 1 on a regression
+
+Every run also times a calibration workload (plain Python calls and dict lookups). The results are compared
+with the baseline relative to it, so a baseline recorded on another machine still gives meaningful changes.
+"""
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import time
+
+from src.backends import Backend, SimulatedBackend, SimulatedIBS
+from src.cleaning_robot import CleaningRobot, GPIO
+
+BASELINE_FILE = os.path.join(os.path.dirname(__file__), "baseline.json")
+CALIBRATION = "calibration"
+
+ROUTE_LENGTHS = (1000, 10000)
+OBSTACLE_DENSITIES = (0.0, 0.1, 0.3)
+
+
+def create_robot(backend_name: str, obstacle_density: float, seed: int = 0) -> CleaningRobot:
+    rng = random.Random(seed)
+
+    def obstacle() -> bool:
+        return rng.random() < obstacle_density
+
+    if backend_name == "mock":
+        robot = CleaningRobot(Backend(GPIO, SimulatedIBS(100)))
+        ##The mock GPIO always reads None from the infrared sensor, so obstacles are drawn here
+        robot.obstacle_found = obstacle
+    else:
+        backend = SimulatedBackend(100)
+        backend.gpio.set_input_source(CleaningRobot.INFRARED_PIN, obstacle)
+        robot = CleaningRobot(backend)
+    robot.initialize_robot()
+    return robot
+
+
+def random_route(length: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    return "".join(rng.choice("fffflr") for _ in range(length))
+
+
+def measure(function, operations: int, repeat: int, setup=None) -> float:
+    """
+    :param setup: if given, called before each run (outside of the timing); function receives its result
+    :return: the best number of operations per second over repeat runs
+    """
+    best = None
+    for _ in range(repeat):
+        fixture = setup() if setup is not None else None
+        gc.disable()  # As timeit does, keep the garbage collector out of the measures
+        try:
+            start = time.perf_counter()
+            if setup is not None:
+                function(fixture)
+            else:
+                function()
+            elapsed = time.perf_counter() - start
+        finally:
+            gc.enable()
+        best = elapsed if best is None else min(best, elapsed)
+    return operations / best if best > 0 else float("inf")
+
+
+class _Calibration:
+
+    def __init__(self):
+        self.table = {heading: index for index, heading in enumerate("NESW")}
+
+    def step(self, heading: str) -> int:
+        return self.table[heading] + 1
+
+
+def calibrate(repeat: int = 5) -> float:
+    """
+    :return: the operations per second of a workload independent of the robot code, on this machine now
+    """
+    calibration = _Calibration()
+    headings = list("NESW") * 25000
+
+    def run():
+        for heading in headings:
+            calibration.step(heading)
+
+    return measure(run, len(headings), repeat)
+
+
+def run_benchmarks(backend_name: str = "mock", repeat: int = 5) -> dict:
+    results = {}
+    for length in ROUTE_LENGTHS:
+        route = random_route(length)
+        for density in OBSTACLE_DENSITIES:
+            suffix = "[n=" + str(length) + ",obstacles=" + str(density) + "]"
+
+            def setup():
+                return create_robot(backend_name, density)
+
+            def execute_command(robot):
+                for command in route:
+                    robot.execute_command(command)
+
+            def execute_commands(robot):
+                robot.execute_commands(route)
+
+            results["execute_command" + suffix] = measure(execute_command, length, repeat, setup)
+            results["execute_commands" + suffix] = measure(execute_commands, length, repeat, setup)
+
+        def make_buzzer_buzz(robot):
+            for _ in range(length // 4):
+                robot.make_buzzer_buzz(robot.heading, [robot.FORWARD, robot.LEFT, robot.LEFT, robot.LEFT])
+
+        results["make_buzzer_buzz[n=" + str(length) + "]"] = measure(make_buzzer_buzz, length // 4, repeat,
+                                                                      lambda: create_robot(backend_name, 0.5))
+
+    robot = create_robot(backend_name, 0.0)
+    operations = 10000
+    commands = [robot.LEFT, robot.RIGHT] * (operations // 2)
+    headings = [robot.N, robot.E, robot.S, robot.W] * (operations // 4)
+
+    def calculate_new_heading():
+        for heading, command in zip(headings, commands):
+            robot.calculate_new_heading(heading, command)
+
+    route = robot.encode_commands(random_route(operations))
+
+    def follow_commands():
+        robot.follow_commands(route)
+
+    def robot_status():
+        for _ in range(operations):
+            robot.robot_status()
+
+    def manage_cleaning_system():
+        for _ in range(operations):
+            robot.manage_cleaning_system()
+
+    results["calculate_new_heading"] = measure(calculate_new_heading, operations, repeat)
+    results["follow_commands"] = measure(follow_commands, operations, repeat)
+    results["robot_status"] = measure(robot_status, operations, repeat)
+    results["manage_cleaning_system"] = measure(manage_cleaning_system, operations, repeat)
+    results[CALIBRATION] = calibrate(repeat)
+    return results
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> tuple:
+    """
+    :return: the report lines and the names of the benchmarks slower than the baseline by more than tolerance,
+    both speeds being taken relative to the calibration measured with them (when the baseline has one)
+    """
+    lines = []
+    regressions = []
+    scale = 1.0
+    if CALIBRATION in results and CALIBRATION in baseline:
+        scale = results[CALIBRATION] / baseline[CALIBRATION]
+        lines.append("{:<50} {:>14,.0f} ops/s  {:+7.1%} (machine speed)".format(CALIBRATION, results[CALIBRATION],
+                                                                              scale - 1))
+    for name in sorted(results):
+        if name == CALIBRATION:
+            continue
+        current = results[name]
+        if name not in baseline:
+            lines.append("{:<50} {:>14,.0f} ops/s  (new)".format(name, current))
+            continue
+        change = current / (baseline[name] * scale) - 1
+        flag = ""
+        if change < -tolerance:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        lines.append("{:<50} {:>14,.0f} ops/s  {:+7.1%}{}".format(name, current, change, flag))
+    return lines, regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", choices=["mock", "simulated"], default="mock")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="slowdown (as a fraction of the baseline) reported as a regression")
+    parser.add_argument("--fail-on-regression", action="store_true",
+                        help="exit with status 1 when a regression is reported")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.backend, args.repeat)
+    baselines = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as baseline_file:
+            baselines = json.load(baseline_file)
+
+    if args.save_baseline:
+        baselines[args.backend] = results
+        with open(args.baseline, "w") as baseline_file:
+            json.dump(baselines, baseline_file, indent=2, sort_keys=True)
+        print("Baseline saved to " + args.baseline)
+
+    lines, regressions = compare(results, baselines.get(args.backend, {}), args.tolerance)
+    print("\n".join(lines))
+    if regressions:
+        print(str(len(regressions)) + " regression(s) beyond " + format(args.tolerance, ".0%"))
+        if args.fail_on_regression:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+import asyncio
+from typing import Iterable
+
+from src.backends import Backend
+from src.cleaning_robot import CleaningRobot
+from src.clock import VirtualClock
+
+
+class AsyncCleaningRobot(CleaningRobot):
+    """
+    CleaningRobot whose motors run as asyncio tasks instead of blocking with time.sleep.
+    While a motor runs, the infrared sensor and the IBS keep being polled, so that a forward
+    move is aborted as soon as an obstacle appears. Cancelling the task running a command
+    (or execute_route) stops the motors right away
+    """
+
+    # Seconds between two sensor readings while a motor is running
+    POLL_INTERVAL = 0.05
+
+    def __init__(self, backend: Backend = None, clock=None, battery_ttl: float = 0.0, forward_discharge: float = 0.0,
+                 rotation_discharge: float = 0.0):
+        super().__init__(backend, clock, battery_ttl, forward_discharge, rotation_discharge)
+        self.motor_time = self.MOTOR_TIME if self.realtime else 0
+        self.charge_left = None
+
+    async def execute_command(self, command: str) -> str:
+        self.last_command_blocked = False
+        self.charge_left = self.battery.charge_left()
+        if self.charge_left <= 10:
+            self.update_cleaning_system(self.charge_left)
+            return "!"+self.robot_status()
+
+        if command == self.FORWARD:
+            posx, posy = self.neighbour_cell(self.pos_x, self.pos_y, self.heading)
+            if self.front_obstacle(posx, posy):
+                return self.block_move(posx, posy)
+            if not await self.run_wheel_motor():
+                return self.block_move(posx, posy)
+            self.battery.record_move(True)
+            self.complete_move(posx, posy)
+        elif command in [self.LEFT, self.RIGHT]:
+            await self.run_rotation_motor(command)
+            self.battery.record_move(False)
+            self.heading = self.calculate_new_heading(self.heading, command)
+            self.motions += 1
+        return self.robot_status()
+
+    async def execute_route(self, commands: Iterable[str]) -> list:
+        results = []
+        for command in commands:
+            result = await self.execute_command(command)
+            results.append(result)
+            if result.startswith("!"):
+                break
+        return results
+
+    async def run_wheel_motor(self) -> bool:
+        """
+        Move the robot forward by one cell
+        :return: False if the move was aborted because an obstacle appeared in front of the robot
+        """
+        self.start_wheel_motor()
+        try:
+            return await self._run_motor("wheel_motor", watch_obstacle=True)
+        finally:
+            self.stop_wheel_motor()
+
+    async def run_rotation_motor(self, direction: str) -> None:
+        self.start_rotation_motor(direction)
+        try:
+            await self._run_motor("rotation_motor", watch_obstacle=False)
+        finally:
+            self.stop_rotation_motor()
+
+    async def _run_motor(self, activity: str, watch_obstacle: bool) -> bool:
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        motion = asyncio.ensure_future(asyncio.sleep(self.motor_time))
+        sensors = asyncio.ensure_future(self._poll_sensors(watch_obstacle))
+        try:
+            await asyncio.wait([motion, sensors], return_when=asyncio.FIRST_COMPLETED)
+            if sensors.done() and sensors.exception() is not None:
+                raise sensors.exception()  # e.g. the IBS could not be read: not an obstacle
+            return not sensors.done()
+        finally:
+            completed = motion.done()
+            motion.cancel()
+            sensors.cancel()
+            if isinstance(self.clock, VirtualClock):
+                ##The motor ran for MOTOR_TIME on the simulated clock, or until it was stopped
+                ran = self.MOTOR_TIME if completed else min(loop.time() - started, self.MOTOR_TIME)
+                self.clock.sleep(ran, activity)
+
+    async def _poll_sensors(self, watch_obstacle: bool) -> None:
+        ##Returns only when an obstacle is detected, otherwise it is cancelled at the end of the move
+        while True:
+            await asyncio.sleep(self.POLL_INTERVAL)
+            self.charge_left = self.battery.charge_left()
+            if watch_obstacle and self.obstacle_found():
+                return
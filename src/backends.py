@@ -0,0 +1,206 @@
+from array import array
+from typing import Callable, Iterable
+
+
+class Backend:
+    """
+    The hardware a CleaningRobot talks to.
+    gpio must offer the RPi.GPIO functions used by the robot (setmode, setwarnings, setup, output, input)
+    and ibs the IBS.get_charge_left method. realtime tells whether the motors need real time to move
+    """
+
+    def __init__(self, gpio, ibs, realtime: bool = False):
+        self.gpio = gpio
+        self.ibs = ibs
+        self.realtime = realtime
+
+    def motor_kept_running(self, pin) -> None:
+        """
+        Called for every cell a motor drives without a new rising edge of its pin, i.e. every cell of a
+        continuous forward move but the first one (see CleaningRobot.drive_cell). The hardware needs nothing
+        """
+
+
+class SimulatedPWM:
+    """
+    Software PWM of a SimulatedGPIO. The pin is HIGH while the duty cycle is above 0, and the duty cycles
+    set since the PWM was created are kept in duty_cycles
+    """
+
+    def __init__(self, gpio: "SimulatedGPIO", channel, frequency):
+        self.gpio = gpio
+        self.channel = channel
+        self.frequency = frequency
+        self.dutycycle = 0
+        self.duty_cycles = []
+        self.running = False
+
+    def start(self, dutycycle) -> None:
+        self.running = True
+        self.ChangeDutyCycle(dutycycle)
+
+    def ChangeFrequency(self, frequency) -> None:
+        self.frequency = frequency
+
+    def ChangeDutyCycle(self, dutycycle) -> None:
+        if not 0 <= dutycycle <= 100:
+            raise ValueError("dutycycle must have a value from 0.0 to 100.0")
+        self.dutycycle = dutycycle
+        self.duty_cycles.append(dutycycle)
+        if self.running:
+            self.gpio.output(self.channel, dutycycle > 0)
+
+    def stop(self) -> None:
+        self.running = False
+        self.gpio.output(self.channel, 0)
+
+
+class SimulatedGPIO:
+    """
+    In-memory GPIO keeping the pin values in a bytearray, without any logging.
+    Input pins return scripted values, see set_input and script_input
+    """
+
+    BCM = 11
+    BOARD = 10
+    BOTH = 33
+    FALLING = 32
+    RISING = 31
+    IN = 1
+    OUT = 0
+    HIGH = 1
+    LOW = 0
+    PINS = 41  # BOARD numbering goes from 1 to 40
+
+    def __init__(self):
+        self.mode = None
+        self.pins = bytearray(self.PINS)
+        self.directions = bytearray(self.PINS)
+        self.rising_edges = array("L", [0] * self.PINS)
+        ##Cells driven by a motor kept running, without a rising edge (see Backend.motor_kept_running)
+        self.kept_running = array("L", [0] * self.PINS)
+        self.writes = 0
+        self.input_sources = {}
+        self.event_callbacks = {}
+
+    def setmode(self, mode) -> None:
+        self.mode = mode
+
+    def setwarnings(self, flag) -> None:
+        pass
+
+    def setup(self, channel, direction, initial=0, pull_up_down=None) -> None:
+        self.directions[channel] = direction
+        self.pins[channel] = 1 if initial else 0
+
+    def output(self, channel, value) -> None:
+        if isinstance(channel, (list, tuple)):
+            if not isinstance(value, (list, tuple)):
+                value = [value] * len(channel)
+            for pin, pin_value in zip(channel, value):
+                self._write(pin, pin_value)
+        else:
+            self._write(channel, value)
+
+    def _write(self, channel, value) -> None:
+        value = 1 if value else 0
+        if value and not self.pins[channel]:
+            self.rising_edges[channel] += 1
+        self.pins[channel] = value
+        self.writes += 1
+
+    def input(self, channel) -> bool:
+        source = self.input_sources.get(channel)
+        if source is not None:
+            self.pins[channel] = 1 if source() else 0
+        return bool(self.pins[channel])
+
+    def PWM(self, channel, frequency) -> SimulatedPWM:
+        return SimulatedPWM(self, channel, frequency)
+
+    def set_input(self, channel, value) -> None:
+        """
+        Drive an input pin, calling its edge callbacks (see add_event_detect) if its value changes
+        """
+        self.input_sources.pop(channel, None)
+        value = 1 if value else 0
+        changed = self.pins[channel] != value
+        self.pins[channel] = value
+        if changed and channel in self.event_callbacks:
+            edge, callbacks = self.event_callbacks[channel]
+            if edge == self.BOTH or edge == (self.RISING if value else self.FALLING):
+                for callback in list(callbacks):
+                    callback(channel)
+
+    def add_event_detect(self, channel, edge, callback=None, bouncetime=None) -> None:
+        self.event_callbacks[channel] = (edge, [callback] if callback is not None else [])
+
+    def add_event_callback(self, channel, callback) -> None:
+        self.event_callbacks[channel][1].append(callback)
+
+    def remove_event_detect(self, channel) -> None:
+        self.event_callbacks.pop(channel, None)
+
+    def set_input_source(self, channel, source: Callable[[], bool]) -> None:
+        """
+        Read the value of an input pin from a function, e.g. one looking at a simulated room
+        """
+        self.input_sources[channel] = source
+
+    def script_input(self, channel, values: Iterable[bool]) -> None:
+        """
+        Return the given values, one per read, then keep returning the last one
+        """
+        values = iter(values)
+
+        def next_value():
+            self.pins[channel] = 1 if next(values, self.pins[channel]) else 0
+            return self.pins[channel]
+
+        self.input_sources[channel] = next_value
+
+
+class SimulatedIBS:
+    """
+    IBS returning a scripted charge. With a SimulatedGPIO, the charge can also drain by a fixed
+    amount every time a motor is activated, i.e. every rising edge of one of the discharge pins and every
+    further cell driven while the motor kept running
+    """
+
+    def __init__(self, charge: float = 100, gpio: SimulatedGPIO = None, discharge: dict = None):
+        """
+        :param charge: the initial charge
+        :param gpio: the GPIO the motors are connected to
+        :param discharge: charge used by each activation of a pin, e.g. {CleaningRobot.PWMA: 0.1}
+        """
+        self.charge = charge
+        self.gpio = gpio
+        self.discharge = discharge or {}
+        self.readings = None
+        self.reads = 0
+
+    def get_charge_left(self) -> int:
+        self.reads += 1
+        if self.readings is not None:
+            self.charge = next(self.readings, self.charge)
+        charge = self.charge
+        if self.gpio is not None:
+            for pin, amount in self.discharge.items():
+                charge -= (self.gpio.rising_edges[pin] + self.gpio.kept_running[pin]) * amount
+        return max(int(charge), 0)
+
+    def script(self, readings: Iterable[float]) -> None:
+        """
+        Return the given readings, one per call, then keep returning the last one
+        """
+        self.readings = iter(readings)
+
+
+class SimulatedBackend(Backend):
+
+    def __init__(self, charge: float = 100, discharge: dict = None):
+        gpio = SimulatedGPIO()
+        super().__init__(gpio, SimulatedIBS(charge, gpio, discharge), realtime=False)
+
+    def motor_kept_running(self, pin) -> None:
+        self.gpio.kept_running[pin] += 1
@@ -0,0 +1,77 @@
+import time
+from typing import Callable
+
+
+class BatteryMonitor:
+    """
+    Reads the charge left from the IBS, reusing the last reading for ttl seconds.
+    Readings are smoothed with an exponential moving average, and between two readings the
+    charge is extrapolated by subtracting the discharge of every move made in the meantime
+    """
+
+    def __init__(self, ibs, ttl: float = 0.0, smoothing: float = 1.0, forward_discharge: float = 0.0,
+                 rotation_discharge: float = 0.0, clock: Callable[[], float] = time.monotonic,
+                 on_read: Callable[[], None] = None):
+        """
+        :param ibs: the Intelligent Battery Sensor
+        :param ttl: seconds a reading is reused for (0: read the IBS every time)
+        :param smoothing: weight of a new reading in the average (1: no smoothing)
+        :param forward_discharge: charge (percentage points) used by a forward move
+        :param rotation_discharge: charge (percentage points) used by a rotation
+        :param clock: function returning the current time in seconds
+        :param on_read: function called before every IBS reading, e.g. to account for the I2C latency
+        """
+        self.ibs = ibs
+        self.ttl = ttl
+        self.smoothing = smoothing
+        self.forward_discharge = forward_discharge
+        self.rotation_discharge = rotation_discharge
+        self.clock = clock
+        self.on_read = on_read
+
+        self.last_reading = None
+        self.last_read_at = None
+        self.smoothed = None
+        self.forward_moves = 0
+        self.rotations = 0
+        self.reads = 0
+
+    def charge_left(self) -> float:
+        """
+        The charge left, read from the IBS only if the last reading is older than ttl
+        """
+        if self.last_read_at is None or self.clock() - self.last_read_at >= self.ttl:
+            self.read()
+        return self.estimated_charge()
+
+    def read(self) -> float:
+        if self.on_read is not None:
+            self.on_read()
+        self.last_reading = self.ibs.get_charge_left()
+        self.last_read_at = self.clock()
+        self.reads += 1
+        if self.smoothed is None:
+            self.smoothed = self.last_reading
+        else:
+            self.smoothed = self.smoothing * self.last_reading + (1 - self.smoothing) * self.smoothed
+        self.forward_moves = 0
+        self.rotations = 0
+        return self.smoothed
+
+    def estimated_charge(self) -> float:
+        """
+        The charge left extrapolated from the last reading, without reading the IBS
+        """
+        if self.smoothed is None:
+            return self.read()
+        return (self.smoothed - self.forward_moves * self.forward_discharge
+                - self.rotations * self.rotation_discharge)
+
+    def record_move(self, forward: bool) -> None:
+        if forward:
+            self.forward_moves += 1
+        else:
+            self.rotations += 1
+
+    def invalidate(self) -> None:
+        self.last_read_at = None
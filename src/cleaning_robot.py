@@ -1,4 +1,13 @@
-import time
+import threading
+from collections import deque
+from typing import Iterable
+
+from src.backends import Backend
+from src.battery_monitor import BatteryMonitor
+from src.clock import SystemClock, VirtualClock
+from src.instrumentation import Instrumentation
+from src.pin_shadow import PinShadow
+from src.sensor_sampler import SensorSampler
 
 DEPLOYMENT = False  # This variable is to understand whether you are deploying on the actual hardware
 
@@ -12,6 +21,19 @@ except:
     import mock.board as board
     import mock.ibs as IBS
 
+##Integer state model: headings are encoded as 0..3 (N, E, S, W) and commands as 0..2 (forward, left, right).
+##Entry heading * 3 + command of NEXT_HEADING, STEP_X and STEP_Y gives the heading and the cell delta after the command
+HEADINGS = ('N', 'E', 'S', 'W')
+COMMANDS = ('f', 'l', 'r')
+HEADING_CODES = {heading: code for code, heading in enumerate(HEADINGS)}
+COMMAND_CODES = {command: code for code, command in enumerate(COMMANDS)}
+DX = (0, 1, 0, -1)
+DY = (1, 0, -1, 0)
+TURNS = (0, -1, 1)
+NEXT_HEADING = tuple((heading + TURNS[command]) % 4 for heading in range(4) for command in range(3))
+STEP_X = tuple(DX[heading] if command == 0 else 0 for heading in range(4) for command in range(3))
+STEP_Y = tuple(DY[heading] if command == 0 else 0 for heading in range(4) for command in range(3))
+
 
 class CleaningRobot:
 
@@ -42,23 +64,57 @@ class CleaningRobot:
     RIGHT = 'r'
     FORWARD = 'f'
 
-    def __init__(self):
-        GPIO.setmode(GPIO.BOARD)
-        GPIO.setwarnings(False)
-        GPIO.setup(self.INFRARED_PIN, GPIO.IN)
-        GPIO.setup(self.RECHARGE_LED_PIN, GPIO.OUT)
-        GPIO.setup(self.CLEANING_SYSTEM_PIN, GPIO.OUT)
+    # Seconds needed by a motor to move the robot by one cell or rotate it by 90 degrees
+    MOTOR_TIME = 1
 
-        GPIO.setup(self.PWMA, GPIO.OUT)
-        GPIO.setup(self.AIN2, GPIO.OUT)
-        GPIO.setup(self.AIN1, GPIO.OUT)
-        GPIO.setup(self.PWMB, GPIO.OUT)
-        GPIO.setup(self.BIN2, GPIO.OUT)
-        GPIO.setup(self.BIN1, GPIO.OUT)
-        GPIO.setup(self.STBY, GPIO.OUT)
+    # Continuous forward moves (see move_forward): the wheel motor is driven through PWM on PWMA, speeding up and
+    # slowing down in RAMP_STEPS duty cycle steps lasting RAMP_TIME seconds in total, and covering a cell in
+    # CRUISE_TIME seconds at full speed. A single cell still takes MOTOR_TIME = RAMP_TIME + CRUISE_TIME + RAMP_TIME
+    PWM_FREQUENCY = 1000
+    RAMP_STEPS = 5
+    RAMP_TIME = 0.25
+    CRUISE_TIME = 0.5
 
-        ic2 = board.I2C()
-        self.ibs = IBS.IBS(ic2)
+    def __init__(self, backend: Backend = None, clock=None, battery_ttl: float = 0.0, forward_discharge: float = 0.0,
+                 rotation_discharge: float = 0.0):
+        """
+        :param backend: the hardware to use; by default the GPIO, I2C board and IBS modules
+        imported above (the real ones when deploying, the mock ones otherwise)
+        :param clock: the time the motors and sensors take (see src.clock); by default a SystemClock
+        if the backend is realtime, a VirtualClock otherwise
+        :param battery_ttl: seconds an IBS reading is reused for by the commands (0: read the IBS for every command)
+        :param forward_discharge: charge used by a forward move, subtracted from a reused reading
+        :param rotation_discharge: charge used by a rotation, subtracted from a reused reading
+        """
+        if backend is None:
+            backend = Backend(GPIO, IBS.IBS(board.I2C()), realtime=DEPLOYMENT)
+        self.backend = backend
+        ##Every pin is read and written through self.gpio, see enable_pin_shadow
+        self.gpio = backend.gpio
+        self.ibs = backend.ibs
+        ##Whether the motors need real time to move (i.e., sleeping while they run)
+        self.realtime = backend.realtime
+        ##Every motor run and sensor reading takes time on self.clock, see src.clock
+        self.clock = clock if clock is not None else SystemClock() if self.realtime else VirtualClock()
+
+        self.gpio.setmode(GPIO.BOARD)
+        self.gpio.setwarnings(False)
+        self.gpio.setup(self.INFRARED_PIN, GPIO.IN)
+        self.gpio.setup(self.RECHARGE_LED_PIN, GPIO.OUT)
+        self.gpio.setup(self.CLEANING_SYSTEM_PIN, GPIO.OUT)
+
+        self.gpio.setup(self.PWMA, GPIO.OUT)
+        self.gpio.setup(self.AIN2, GPIO.OUT)
+        self.gpio.setup(self.AIN1, GPIO.OUT)
+        self.gpio.setup(self.PWMB, GPIO.OUT)
+        self.gpio.setup(self.BIN2, GPIO.OUT)
+        self.gpio.setup(self.BIN1, GPIO.OUT)
+        self.gpio.setup(self.STBY, GPIO.OUT)
+
+        ##Every charge reading goes through self.battery, which may cache it (see BatteryMonitor.ttl)
+        self.battery = BatteryMonitor(self.ibs, battery_ttl, forward_discharge=forward_discharge,
+                                      rotation_discharge=rotation_discharge, clock=self.clock.now,
+                                      on_read=lambda: self.clock.device_access("ibs"))
 
         self.pos_x = None
         self.pos_y = None
@@ -70,54 +126,224 @@ class CleaningRobot:
         ##Added
         self.buzzer_on = False
         self.block_way= False
+        ##Whether the last command was a forward move stopped by an obstacle (block_way stays set after rotations)
+        self.last_command_blocked = False
+        ##Incremented after every change of position or heading, see src.sensor_sampler
+        self.motions = 0
+
+        ##Occupancy grid (see src.room_map.RoomMap) filled with the obstacles met while moving
+        self.room_map = None
+        ##Cells cleaned by the forward moves (see src.coverage_map.CoverageMap)
+        self.coverage_map = None
+
+        ##Interrupt-driven obstacle detection, see enable_obstacle_interrupts
+        self.interrupts_enabled = False
+        self.obstacle_flag = False
+        self.obstacle_event = threading.Event()
+        self.edge_timestamps = deque(maxlen=1000)
+        self.move_aborted = False
+
+        ##PWM driving the wheel motor during continuous forward moves, created by the first one
+        self.wheel_pwm = None
+        self.wheel_moving = False
+        ##Forward moves left in the current continuous run, the one being executed included
+        self.cells_ahead = 0
+
+        ##Latency histograms and counters, see enable_instrumentation
+        self.instrumentation = None
+        ##Background sensor polling, see enable_sensor_sampler
+        self.sensor_sampler = None
 
     def initialize_robot(self) -> None:
         self.pos_x = 0
         self.pos_y = 0
         self.heading = self.N
+        self.motions += 1
 
     def robot_status(self) -> str:
         return "("+ str(self.pos_x) + "," + str(self.pos_y)+"," + str(self.heading)+")"
 
     def execute_command(self, command: str) -> str:
-        if self.ibs.get_charge_left() > 10:
-            if command == self.FORWARD:
-                posy, posx = self.pos_y, self.pos_x
-                if self.heading == self.N:
-                    posy +=1
-                elif self.heading == self.S:
-                    posy-=1
-                elif self.heading == self.E:
-                    posx+=1
-                elif self.heading == self.W:
-                    posx-=1
-
-                if not self.obstacle_found():
-                    self.block_way = False
-                    self.activate_wheel_motor()
-                    self.pos_y, self.pos_x = posy, posx
+        return self._execute_command(command, self.battery.charge_left())
+
+    def execute_commands(self, commands: Iterable[str], battery_check_interval: int = 50,
+                         merge_forward: bool = False) -> list:
+        """
+        Execute a whole route, reading the IBS only once every battery_check_interval commands
+        :param commands: the route, e.g. "ffrfl" or ["f", "f", "r"]
+        :param battery_check_interval: number of commands executed between two IBS readings
+        :param merge_forward: drive every run of consecutive forward moves as one continuous move (see move_forward).
+        Each move of the run is still executed, checked for the battery and reported on its own
+        :return: the status returned by each executed command. The route stops at the first
+        command refused because of low battery, whose status starts with "!"
+        """
+        commands = list(commands)
+        if battery_check_interval < 1:
+            raise CleaningRobotError()
+        for command in commands:
+            if command not in [self.FORWARD, self.LEFT, self.RIGHT]:
+                raise CleaningRobotError()
+
+        results = []
+        try:
+            for step, command in enumerate(commands):
+                if step % battery_check_interval == 0:
+                    charge_left = self.battery.charge_left()
                 else:
-                    self.block_way = True
-                    return self.robot_status()+"("+str(posx)+","+str(posy)+")"
+                    charge_left = self.battery.estimated_charge()
+                if merge_forward and command == self.FORWARD and self.cells_ahead == 0:
+                    ##First move of a run: the wheel motor keeps running until the last cell of the run
+                    while step + self.cells_ahead < len(commands) and commands[step + self.cells_ahead] == self.FORWARD:
+                        self.cells_ahead += 1
+                results.append(self._execute_command(command, charge_left))
+                if self.cells_ahead > 0:
+                    self.cells_ahead -= 1
+                if charge_left <= 10:
+                    break
+        finally:
+            self.cells_ahead = 0
+            if self.wheel_moving:
+                ##The run was cut short, e.g. by a low battery
+                self.ramp_wheel_pwm(100, 0)
+                self.stop_wheel_pwm()
+        return results
+
+    def move_forward(self, cells: int) -> list:
+        """
+        Move forward by several cells in one continuous motion: the wheel motor speeds up once, checks for
+        obstacles before entering each cell and slows down once, instead of stopping after every cell
+        :return: the status after each cell, as execute_command would return it
+        """
+        if cells < 1:
+            raise CleaningRobotError()
+        return self.execute_commands([self.FORWARD] * cells, merge_forward=True)
+
+    def _execute_command(self, command: str, charge_left: int) -> str:
+        self.last_command_blocked = False
+        if charge_left > 10:
+            if command == self.FORWARD:
+                posx, posy = self.neighbour_cell(self.pos_x, self.pos_y, self.heading)
+                if self.front_obstacle(posx, posy):
+                    return self.block_move(posx, posy)
+                self.activate_wheel_motor()
+                self.battery.record_move(True)
+                if self.move_aborted:
+                    return self.block_move(posx, posy)
+                self.complete_move(posx, posy)
             elif command == self.LEFT:
                 self.activate_rotation_motor(self.LEFT)
+                self.battery.record_move(False)
                 self.heading = self.calculate_new_heading(self.heading, self.LEFT)
+                self.motions += 1
             elif command == self.RIGHT:
                 self.activate_rotation_motor(self.RIGHT)
+                self.battery.record_move(False)
                 self.heading = self.calculate_new_heading(self.heading, self.RIGHT)
+                self.motions += 1
             return self.robot_status()
         else:
-            self.manage_cleaning_system()
+            self.update_cleaning_system(charge_left)
             return "!"+self.robot_status()
 
+    def go_to(self, x: int, y: int) -> list:
+        """
+        Drive the robot to a cell of the room map (e.g. its dock), avoiding the obstacles met on the way.
+        The route is planned with D* Lite and repaired, not planned again, when a new obstacle is found
+        :return: the status returned by each executed command
+        """
+        from src.navigation import DStarLite
+
+        if self.room_map is None:
+            raise CleaningRobotError()
+        planner = DStarLite(self.room_map, x, y)
+        planner.set_start(self.pos_x, self.pos_y, self.heading)
+        results = []
+        while (self.pos_x, self.pos_y) != (x, y):
+            command = planner.next_command()
+            result = self.execute_command(command)
+            results.append(result)
+            if result.startswith("!"):
+                break
+            planner.set_start(self.pos_x, self.pos_y, self.heading)
+            if command == self.FORWARD and self.block_way:
+                obstacle_x, obstacle_y = self.neighbour_cell(self.pos_x, self.pos_y, self.heading)
+                planner.add_obstacle(obstacle_x, obstacle_y, self.clock.now())
+        return results
+
+    def front_obstacle(self, posx: int, posy: int) -> bool:
+        if self.room_map is not None and self.room_map.is_known_obstacle(posx, posy, self.clock.now()):
+            return True  # No need to read the infrared sensor again
+        return bool(self.obstacle_found())
+
+    def complete_move(self, posx: int, posy: int) -> None:
+        self.block_way = False
+        self.pos_y, self.pos_x = posy, posx
+        self.motions += 1
+        if self.room_map is not None:
+            self.room_map.clear_obstacle(posx, posy)
+        if self.coverage_map is not None:
+            self.coverage_map.record_visit(posx, posy, self.clock.now())
+
+    def block_move(self, posx: int, posy: int) -> str:
+        if self.wheel_moving:
+            self.stop_wheel_pwm()
+        self.block_way = True
+        self.last_command_blocked = True
+        if self.room_map is not None:
+            self.room_map.mark_obstacle(posx, posy, self.clock.now())
+        return self.robot_status()+"("+str(posx)+","+str(posy)+")"
+
+    def neighbour_cell(self, x: int, y: int, heading: str) -> tuple:
+        code = HEADING_CODES.get(heading)
+        if code is None:
+            return x, y
+        return x + DX[code], y + DY[code]
+
     def calculate_new_heading(self, current_heading: str, direction: str) -> str:
-        headings = [self.N, self.E, self.S, self.W]
-        position_current_heading = headings.index(current_heading)
-        if direction == self.LEFT:
-            position_current_heading -= 1
-        elif direction == self.RIGHT:
-            position_current_heading += 1
-        return headings[position_current_heading]
+        return HEADINGS[NEXT_HEADING[HEADING_CODES[current_heading] * 3 + COMMAND_CODES.get(direction, 0)]]
+
+    @staticmethod
+    def encode_commands(commands: Iterable[str]) -> bytes:
+        """
+        :return: the integer codes of a route, e.g. bytes([0, 0, 2]) for "ffr"
+        """
+        try:
+            return bytes(COMMAND_CODES[command] for command in commands)
+        except KeyError:
+            raise CleaningRobotError()
+
+    @staticmethod
+    def next_pose(x: int, y: int, heading: int, command: int) -> tuple:
+        """
+        Integer fast path of neighbour_cell and calculate_new_heading, without any obstacle check
+        :return: the pose (x, y, heading code) reached with the command code
+        """
+        index = heading * 3 + command
+        return x + STEP_X[index], y + STEP_Y[index], NEXT_HEADING[index]
+
+    def follow_commands(self, commands, x: int = None, y: int = None, heading: str = None) -> tuple:
+        """
+        Compute the pose reached at the end of a whole route, assuming no obstacle and without moving the robot
+        :param commands: the route, e.g. "ffrfl", or the bytes returned by encode_commands
+        :param x: starting x coordinate (the robot position by default)
+        :param y: starting y coordinate (the robot position by default)
+        :param heading: starting heading (the robot heading by default)
+        :return: the final pose (x, y, heading)
+        """
+        if not isinstance(commands, (bytes, bytearray)):
+            commands = self.encode_commands(commands)
+        x = self.pos_x if x is None else x
+        y = self.pos_y if y is None else y
+        code = HEADING_CODES.get(self.heading if heading is None else heading)
+        if code is None:
+            raise CleaningRobotError()
+        next_heading, step_x, step_y = NEXT_HEADING, STEP_X, STEP_Y
+        for command in commands:
+            index = code * 3 + command
+            x += step_x[index]
+            y += step_y[index]
+            code = next_heading[index]
+        return x, y, HEADINGS[code]
 
     def make_buzzer_buzz(self, actual_heading: str, next_commands: list):
         ##if the robot is in the initial position, it will have only 2 headings as options
@@ -138,75 +364,239 @@ class CleaningRobot:
                 if block_way !=0:
                     block_way -= 1
 
-        if block_way > 1:
-            GPIO.output(self.BUZZER_PIN, True)
-            self.buzzer_on = True
-        else:
-            GPIO.output(self.BUZZER_PIN, False)
-            self.buzzer_on = False
+        self.set_buzzer(block_way > 1)
+
+    def probe_neighbours(self) -> dict:
+        """
+        Check which of the four cells around the robot are blocked, without moving or rotating it.
+        The cell in front is checked with the infrared sensor, every cell against the room map
+        (cells outside the room count as blocked)
+        :return: a dictionary telling, for each heading, whether the neighbouring cell is blocked
+        """
+        blocked = {}
+        for heading in [self.N, self.E, self.S, self.W]:
+            x, y = self.neighbour_cell(self.pos_x, self.pos_y, heading)
+            if self.room_map is not None:
+                blocked[heading] = (not self.room_map.contains(x, y)
+                                    or self.room_map.is_known_obstacle(x, y, self.clock.now()))
+            else:
+                blocked[heading] = False
+            if heading == self.heading and not blocked[heading]:
+                blocked[heading] = bool(self.obstacle_found())
+        return blocked
+
+    def check_stuck(self) -> bool:
+        """
+        Make the buzzer buzz if all the cells around the robot are blocked
+        :return: True if the robot is stuck
+        """
+        stuck = all(self.probe_neighbours().values())
+        self.set_buzzer(stuck)
+        return stuck
+
+    def set_buzzer(self, on: bool) -> None:
+        self.gpio.output(self.BUZZER_PIN, on)
+        self.buzzer_on = on
 
     def obstacle_found(self) -> bool:
-        return GPIO.input(self.INFRARED_PIN)
+        if self.interrupts_enabled:
+            return self.obstacle_flag
+        if self.sensor_sampler is not None:
+            found = self.sensor_sampler.latest_infrared()
+            if found is not None:
+                return found
+        self.clock.device_access("infrared")
+        return self.gpio.input(self.INFRARED_PIN)
+
+    def enable_obstacle_interrupts(self, bouncetime: int = 10) -> None:
+        """
+        Stop polling the infrared sensor: its edges update an obstacle flag, and a rising edge
+        stops a forward move in progress
+        :param bouncetime: switch bounce timeout (ms) of the edge detection
+        """
+        self.set_obstacle_flag(bool(self.gpio.input(self.INFRARED_PIN)))
+        self.gpio.add_event_detect(self.INFRARED_PIN, GPIO.BOTH, callback=self.on_infrared_edge, bouncetime=bouncetime)
+        self.interrupts_enabled = True
+
+    def disable_obstacle_interrupts(self) -> None:
+        self.gpio.remove_event_detect(self.INFRARED_PIN)
+        self.interrupts_enabled = False
+
+    def on_infrared_edge(self, channel) -> None:
+        """
+        Edge callback of the infrared sensor, run by the GPIO library on its own thread
+        """
+        value = bool(self.gpio.input(channel))
+        self.edge_timestamps.append((self.clock.now(), value))
+        self.set_obstacle_flag(value)
+
+    def set_obstacle_flag(self, value: bool) -> None:
+        self.obstacle_flag = value
+        if value:
+            self.obstacle_event.set()
+        else:
+            self.obstacle_event.clear()
 
     def manage_cleaning_system(self) -> None:
-        if self.ibs.get_charge_left() > 10:
-            GPIO.output(self.RECHARGE_LED_PIN, GPIO.LOW)
+        self.update_cleaning_system(self.battery.charge_left())
+
+    def update_cleaning_system(self, charge_left: int) -> None:
+        """
+        Switch the recharge LED and the cleaning system according to an already read charge
+        :param charge_left: the charge left, as returned by the IBS
+        """
+        if charge_left > 10:
+            self.output_pins([self.RECHARGE_LED_PIN, self.CLEANING_SYSTEM_PIN], [GPIO.LOW, GPIO.HIGH])
             self.recharge_led_on = False
-            GPIO.output(self.CLEANING_SYSTEM_PIN, GPIO.HIGH)
             self.cleaning_system_on = True
         else:
-            GPIO.output(self.RECHARGE_LED_PIN, GPIO.HIGH)
+            self.output_pins([self.RECHARGE_LED_PIN, self.CLEANING_SYSTEM_PIN], [GPIO.HIGH, GPIO.LOW])
             self.recharge_led_on = True
-            GPIO.output(self.CLEANING_SYSTEM_PIN, GPIO.LOW)
             self.cleaning_system_on = False
 
+    def output_pins(self, channels: list, values: list) -> None:
+        """
+        Write several output pins at once. With a pin shadow enabled, the pins whose value does not
+        change are skipped and the others are written with a single GPIO.output call
+        """
+        if isinstance(self.gpio, PinShadow):
+            self.gpio.output_many(channels, values)
+        else:
+            for channel, value in zip(channels, values):
+                self.gpio.output(channel, value)
+
+    def enable_instrumentation(self) -> Instrumentation:
+        """
+        Start measuring command, motor and IBS latencies, GPIO writes and obstacle hits.
+        Until this is called, the robot pays nothing for the instrumentation
+        """
+        if self.instrumentation is None:
+            self.instrumentation = Instrumentation().attach(self)
+        return self.instrumentation
+
+    def disable_instrumentation(self) -> None:
+        if self.instrumentation is not None:
+            self.instrumentation.detach()
+            self.instrumentation = None
+
+    def enable_sensor_sampler(self, infrared_rate: float = 100.0, battery_rate: float = 1.0,
+                              max_infrared_age: float = 0.05, max_battery_age: float = 5.0,
+                              capacity: int = 256) -> SensorSampler:
+        """
+        Poll the infrared sensor and the IBS on a background thread (see src.sensor_sampler.SensorSampler),
+        so that commands, the cleaning system and the buzzer check read the latest samples instead of the
+        sensors; a sensor is still read directly when its last sample is older than its staleness limit.
+        On a VirtualClock, the sensors are sampled by events of the clock instead, at the same rates
+        """
+        if self.sensor_sampler is None:
+            self.sensor_sampler = SensorSampler(self.gpio, self.battery.ibs, self.INFRARED_PIN, infrared_rate,
+                                                battery_rate, max_infrared_age, max_battery_age, capacity,
+                                                clock=self.clock.now, motions=lambda: self.motions,
+                                                call_at=self.clock.call_at if isinstance(self.clock, VirtualClock)
+                                                else None)
+            self.sensor_sampler.attach(self)
+            self.sensor_sampler.start()
+        return self.sensor_sampler
+
+    def disable_sensor_sampler(self) -> None:
+        if self.sensor_sampler is not None:
+            self.sensor_sampler.stop()
+            self.sensor_sampler.detach(self)
+            self.sensor_sampler = None
+
+    def enable_pin_shadow(self) -> PinShadow:
+        if not isinstance(self.gpio, PinShadow):
+            self.gpio = PinShadow(self.gpio)
+        return self.gpio
+
     def activate_wheel_motor(self) -> None:
         """
-        Let the robot move forward by activating its wheel motor
+        Let the robot move forward by activating its wheel motor. Within a continuous run of forward
+        moves (see move_forward), the motor keeps running from one cell to the next instead
+        """
+        self.move_aborted = False
+        if self.cells_ahead > 0:
+            self.drive_cell()
+            return
+        self.start_wheel_motor()
+
+        if self.interrupts_enabled:
+            # Wait for the motor to actually move, unless an obstacle shows up meanwhile
+            self.move_aborted = self.clock.wait(self.obstacle_event, self.MOTOR_TIME, "wheel_motor")
+        else:
+            self.clock.sleep(self.MOTOR_TIME, "wheel_motor") # Wait for the motor to actually move
+
+        self.stop_wheel_motor()
+
+    def start_wheel_motor(self) -> None:
+        # Drive the motor clockwise (AIN1, AIN2), set the motor speed (PWMA) and disable STBY
+        self.output_pins([self.AIN1, self.AIN2, self.PWMA, self.STBY], [GPIO.HIGH, GPIO.LOW, GPIO.HIGH, GPIO.HIGH])
+
+    def stop_wheel_motor(self) -> None:
+        self.output_pins([self.AIN1, self.AIN2, self.PWMA, self.STBY], [GPIO.LOW, GPIO.LOW, GPIO.LOW, GPIO.LOW])
+
+    def start_wheel_pwm(self) -> None:
+        """
+        Drive the wheel motor clockwise through PWM on PWMA, ramping up to full speed
         """
-        # Drive the motor clockwise
-        GPIO.output(self.AIN1, GPIO.HIGH)
-        GPIO.output(self.AIN2, GPIO.LOW)
-        # Set the motor speed
-        GPIO.output(self.PWMA, GPIO.HIGH)
-        # Disable STBY
-        GPIO.output(self.STBY, GPIO.HIGH)
+        if self.wheel_pwm is None:
+            self.wheel_pwm = self.gpio.PWM(self.PWMA, self.PWM_FREQUENCY)
+        self.output_pins([self.AIN1, self.AIN2, self.STBY], [GPIO.HIGH, GPIO.LOW, GPIO.HIGH])
+        self.wheel_pwm.start(0)
+        self.wheel_moving = True
+        self.ramp_wheel_pwm(0, 100)
+
+    def drive_cell(self) -> None:
+        """
+        Drive one cell of a continuous run at full speed, starting the wheel motor if it is not running yet;
+        during the last cell of the run, slow down at the end. An obstacle edge seen meanwhile (with obstacle
+        interrupts enabled) sets move_aborted, and block_move then stops the motor
+        """
+        if self.wheel_moving:
+            self.backend.motor_kept_running(self.PWMA)
+        else:
+            self.start_wheel_pwm()
+        if self.interrupts_enabled:
+            self.move_aborted = self.clock.wait(self.obstacle_event, self.CRUISE_TIME, "wheel_motor")
+        else:
+            self.clock.sleep(self.CRUISE_TIME, "wheel_motor")
+        if self.cells_ahead == 1 and not self.move_aborted:
+            self.ramp_wheel_pwm(100, 0)
+            self.stop_wheel_pwm()
 
-        if DEPLOYMENT: # Sleep only if you are deploying on the actual hardware
-            time.sleep(1) # Wait for the motor to actually move
+    def ramp_wheel_pwm(self, start: float, end: float) -> None:
+        for step in range(1, self.RAMP_STEPS + 1):
+            self.wheel_pwm.ChangeDutyCycle(start + (end - start) * step / self.RAMP_STEPS)
+            self.clock.sleep(self.RAMP_TIME / self.RAMP_STEPS, "wheel_motor")
 
-        # Stop the motor
-        GPIO.output(self.AIN1, GPIO.LOW)
-        GPIO.output(self.AIN2, GPIO.LOW)
-        GPIO.output(self.PWMA, GPIO.LOW)
-        GPIO.output(self.STBY, GPIO.LOW)
+    def stop_wheel_pwm(self) -> None:
+        self.wheel_pwm.stop()
+        self.wheel_moving = False
+        self.output_pins([self.AIN1, self.AIN2, self.STBY], [GPIO.LOW, GPIO.LOW, GPIO.LOW])
 
     def activate_rotation_motor(self, direction) -> None:
         """
         Let the robot rotate towards a given direction
         :param direction: "l" to turn left, "r" to turn right
         """
+        self.start_rotation_motor(direction)
+
+        self.clock.sleep(self.MOTOR_TIME, "rotation_motor")  # Wait for the motor to actually move
+
+        self.stop_rotation_motor()
+
+    def start_rotation_motor(self, direction) -> None:
         if direction not in [self.LEFT, self.RIGHT]:
             raise CleaningRobotError()
 
         if direction == self.LEFT:
-            GPIO.output(self.BIN1, GPIO.HIGH)
-            GPIO.output(self.BIN2, GPIO.LOW)
-        elif direction == self.RIGHT:
-            GPIO.output(self.BIN1, GPIO.LOW)
-            GPIO.output(self.BIN2, GPIO.HIGH)
-
-        GPIO.output(self.PWMB, GPIO.HIGH)
-        GPIO.output(self.STBY, GPIO.HIGH)
-
-        if DEPLOYMENT:  # Sleep only if you are deploying on the actual hardware
-            time.sleep(1)  # Wait for the motor to actually move
-
-        # Stop the motor
-        GPIO.output(self.BIN1, GPIO.LOW)
-        GPIO.output(self.BIN2, GPIO.LOW)
-        GPIO.output(self.PWMB, GPIO.LOW)
-        GPIO.output(self.STBY, GPIO.LOW)
+            bin1, bin2 = GPIO.HIGH, GPIO.LOW
+        else:
+            bin1, bin2 = GPIO.LOW, GPIO.HIGH
+        self.output_pins([self.BIN1, self.BIN2, self.PWMB, self.STBY], [bin1, bin2, GPIO.HIGH, GPIO.HIGH])
+
+    def stop_rotation_motor(self) -> None:
+        self.output_pins([self.BIN1, self.BIN2, self.PWMB, self.STBY], [GPIO.LOW, GPIO.LOW, GPIO.LOW, GPIO.LOW])
 
 
 class CleaningRobotError(Exception):
@@ -0,0 +1,109 @@
+import heapq
+import threading
+import time
+from typing import Callable
+
+
+class SystemClock:
+    """
+    Real time: sleeping blocks the caller, and devices take the time they actually need
+    """
+
+    def now(self) -> float:
+        return time.monotonic()
+
+    def sleep(self, seconds: float, activity: str = None) -> None:
+        time.sleep(seconds)
+
+    def wait(self, event: threading.Event, seconds: float, activity: str = None) -> bool:
+        """
+        Wait for an event for at most the given seconds
+        :return: whether the event was set
+        """
+        return event.wait(seconds)
+
+    def device_access(self, device: str) -> None:
+        pass
+
+
+class VirtualClock:
+    """
+    Discrete-event simulated time. Sleeping advances the time at once, running the events scheduled
+    meanwhile (see call_at), and every device access advances it by the latency of the device, so that
+    a long mission simulates in a fraction of its duration. The time spent by every activity (e.g. the
+    wheel motor) is summed up to compute its duty cycle
+    """
+
+    ##Seconds needed to read the infrared sensor and to read the IBS over I2C
+    LATENCIES = {"infrared": 0.0001, "ibs": 0.002}
+
+    def __init__(self, start: float = 0.0, latencies: dict = None):
+        """
+        :param start: the initial time in seconds
+        :param latencies: seconds needed by each device access, on top of (or replacing) LATENCIES
+        """
+        self.start = start
+        self.time = start
+        self.latencies = dict(self.LATENCIES)
+        self.latencies.update(latencies or {})
+        self.busy = {}
+        self.events = []
+        self.scheduled = 0
+
+    def now(self) -> float:
+        return self.time
+
+    def call_at(self, when: float, callback: Callable[[], None]) -> None:
+        """
+        Run a callback (e.g. one driving a simulated sensor) once the time reaches when
+        """
+        self.scheduled += 1
+        heapq.heappush(self.events, (when, self.scheduled, callback))
+
+    def call_later(self, delay: float, callback: Callable[[], None]) -> None:
+        self.call_at(self.time + delay, callback)
+
+    def sleep(self, seconds: float, activity: str = None) -> None:
+        self._advance(self.time + seconds, None, activity)
+
+    def wait(self, event: threading.Event, seconds: float, activity: str = None) -> bool:
+        return self._advance(self.time + seconds, event, activity)
+
+    def device_access(self, device: str) -> None:
+        latency = self.latencies.get(device, 0.0)
+        if latency:
+            self.sleep(latency, device)
+
+    def _advance(self, until: float, event: threading.Event, activity: str) -> bool:
+        start = self.time
+        stopped = event is not None and event.is_set()
+        while not stopped and self.events and self.events[0][0] <= until:
+            when, _, callback = heapq.heappop(self.events)
+            self.time = max(self.time, when)
+            callback()
+            stopped = event is not None and event.is_set()
+        if not stopped:
+            self.time = until
+        if activity is not None:
+            self.busy[activity] = self.busy.get(activity, 0.0) + self.time - start
+        return stopped
+
+    def elapsed(self) -> float:
+        return self.time - self.start
+
+    def duty_cycle(self, *activities: str) -> float:
+        """
+        Fraction of the elapsed time spent in the given activities
+        """
+        elapsed = self.elapsed()
+        return sum(self.busy.get(activity, 0.0) for activity in activities) / elapsed if elapsed > 0 else 0.0
+
+    def report(self) -> dict:
+        """
+        :return: the projected duration in seconds, the time spent by every activity and the duty cycle of the motors
+        """
+        return {"duration": self.elapsed(),
+                "busy": dict(self.busy),
+                "motor_duty_cycle": self.duty_cycle("wheel_motor", "rotation_motor"),
+                "wheel_motor_duty_cycle": self.duty_cycle("wheel_motor"),
+                "rotation_motor_duty_cycle": self.duty_cycle("rotation_motor")}
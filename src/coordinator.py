@@ -0,0 +1,160 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src.cleaning_robot import COMMAND_CODES, HEADING_CODES, CleaningRobot, CleaningRobotError
+from src.room_map import RoomMap
+
+
+class Coordinator:
+    """
+    Runs several robots in the same room. The robots share one room map, and before moving a robot
+    reserves the next cells of its route (a lookahead window), all of them at once, so that robots never
+    plan through each other. A robot waiting too long for its window (e.g. two robots facing each other)
+    skips that forward command and reports it as timed out
+    """
+
+    def __init__(self, room_map: RoomMap, wait_timeout: float = 1.0, lookahead: int = 3):
+        """
+        :param room_map: the map shared by all the robots
+        :param wait_timeout: seconds a robot waits for its reserved cells before skipping the move
+        :param lookahead: number of cells of its route a robot reserves ahead of itself
+        """
+        if lookahead < 1:
+            raise CleaningRobotError()
+        self.room_map = room_map
+        self.wait_timeout = wait_timeout
+        self.lookahead = lookahead
+        self.robots = {}
+        self.reservations = {}
+        self.condition = threading.Condition()
+
+    def add_robot(self, robot_id, robot: CleaningRobot) -> None:
+        cell = (robot.pos_x, robot.pos_y)
+        if robot_id in self.robots or not self.room_map.contains(*cell) or not self.reserve(robot_id, cell, 0):
+            raise CleaningRobotError()
+        robot.room_map = self.room_map
+        self.robots[robot_id] = robot
+
+    def reserve(self, robot_id, cell: tuple, timeout: float = None) -> bool:
+        """
+        Reserve a cell for a robot, waiting for it to be released if another robot holds it
+        :return: False if the cell was still held by another robot after timeout seconds
+        """
+        return self.reserve_all(robot_id, [cell], timeout)
+
+    def reserve_all(self, robot_id, cells: list, timeout: float = None) -> bool:
+        """
+        Reserve several cells for a robot at once: none of them is taken until all of them are free
+        :return: False if one of the cells was still held by another robot after timeout seconds
+        """
+        with self.condition:
+            reserved = self.condition.wait_for(
+                lambda: all(self.reservations.get(cell, robot_id) == robot_id for cell in cells),
+                self.wait_timeout if timeout is None else timeout)
+            if reserved:
+                for cell in cells:
+                    self.reservations[cell] = robot_id
+            return reserved
+
+    def release(self, robot_id, cell: tuple) -> None:
+        with self.condition:
+            if self.reservations.get(cell) == robot_id:
+                del self.reservations[cell]
+                self.condition.notify_all()
+
+    def release_all_but(self, robot_id, cell: tuple) -> None:
+        """
+        Release every cell held by a robot except the given one (the cell the robot stands on)
+        """
+        with self.condition:
+            held = [other for other, holder in self.reservations.items() if holder == robot_id and other != cell]
+            for other in held:
+                del self.reservations[other]
+            if held:
+                self.condition.notify_all()
+
+    def holder(self, cell: tuple):
+        return self.reservations.get(cell)
+
+    def window(self, robot: CleaningRobot, commands: str) -> list:
+        """
+        :return: the next cells the robot enters following the commands, at most lookahead of them,
+        stopping at the walls and at the known obstacles
+        """
+        cells = []
+        x, y, heading = robot.pos_x, robot.pos_y, HEADING_CODES[robot.heading]
+        for command in commands:
+            x, y, heading = CleaningRobot.next_pose(x, y, heading, COMMAND_CODES[command])
+            if command != robot.FORWARD:
+                continue
+            if not self.room_map.contains(x, y) or self.room_map.is_obstacle(x, y):
+                break
+            cells.append((x, y))
+            if len(cells) == self.lookahead:
+                break
+        return cells
+
+    def execute_route(self, robot_id, commands) -> dict:
+        """
+        Execute a route with one of the robots, reserving the next cells of the route before entering them
+        :return: the statistics of the robot, "timed_out" listing the index and target cell of every forward
+        command skipped because its cells stayed reserved by another robot
+        """
+        robot = self.robots[robot_id]
+        commands = "".join(commands)
+        visited = {(robot.pos_x, robot.pos_y)}
+        moves = blocked = 0
+        timed_out = []
+        for index, command in enumerate(commands):
+            if command != robot.FORWARD:
+                if robot.execute_command(command).startswith("!"):
+                    break
+                continue
+
+            cell = (robot.pos_x, robot.pos_y)
+            target = robot.neighbour_cell(robot.pos_x, robot.pos_y, robot.heading)
+            if not self.room_map.contains(*target):
+                blocked += 1
+                continue
+            if self.holder(target) != robot_id:
+                ##Past the end of the window: give back what is left of it and reserve the next one
+                self.release_all_but(robot_id, cell)
+                if not self.reserve_all(robot_id, self.window(robot, commands[index:]) or [target]):
+                    timed_out.append((index, target))
+                    continue
+            result = robot.execute_command(command)
+            if (robot.pos_x, robot.pos_y) == target:
+                self.release(robot_id, cell)
+                visited.add(target)
+                moves += 1
+            else:
+                self.release_all_but(robot_id, cell)
+                blocked += 1
+            if result.startswith("!"):
+                break
+        self.release_all_but(robot_id, (robot.pos_x, robot.pos_y))
+        return {"visited": visited, "moves": moves, "blocked_moves": blocked, "conflicts": len(timed_out),
+                "timed_out": timed_out}
+
+    def run(self, routes: dict) -> dict:
+        """
+        Execute the routes of several robots concurrently, one thread per robot
+        :param routes: the route of each robot, by robot id
+        :return: the statistics of each robot under "robots", and the cells cleaned by all of them
+        """
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max(len(routes), 1)) as executor:
+            futures = {robot_id: executor.submit(self.execute_route, robot_id, route)
+                       for robot_id, route in routes.items()}
+            reports = {robot_id: future.result() for robot_id, future in futures.items()}
+        elapsed = time.perf_counter() - start
+
+        cleaned = set()
+        for report in reports.values():
+            cleaned |= report["visited"]
+        return {"robots": reports,
+                "cells_cleaned": len(cleaned),
+                "conflicts": sum(report["conflicts"] for report in reports.values()),
+                "elapsed": elapsed,
+                "cells_cleaned_per_second": len(cleaned) / elapsed if elapsed > 0 else 0.0}
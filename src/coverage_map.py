@@ -0,0 +1,112 @@
+import time
+from array import array
+from typing import Callable
+
+from src.cleaning_robot import CleaningRobotError
+
+
+class CoverageMap:
+    """
+    Which cells of the room were cleaned, how many times and when. Cell (x, y) is stored at index
+    y * width + x, as in RoomMap: one byte telling whether it was ever cleaned, a 16-bit visit count
+    (saturating) and the time of the last cleaning
+    """
+
+    MAX_VISITS = 0xFFFF
+
+    def __init__(self, width: int, height: int, clock: Callable[[], float] = time.monotonic):
+        """
+        :param width: number of cells along the x axis
+        :param height: number of cells along the y axis
+        :param clock: function returning the current time in seconds
+        """
+        if width <= 0 or height <= 0:
+            raise CleaningRobotError()
+        self.width = width
+        self.height = height
+        self.clock = clock
+        self.cleaned = bytearray(width * height)
+        self.visits = array("H", bytes(2 * width * height))
+        self.cleaned_at = array("d", bytes(8 * width * height))
+        self.cleaned_cells = 0
+
+    def contains(self, x: int, y: int) -> bool:
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def record_visit(self, x: int, y: int, now: float = None) -> None:
+        """
+        :param now: the current time on the caller's clock, e.g. the clock of the robot that cleaned the cell
+        (None: the map's clock)
+        """
+        if not self.contains(x, y):
+            return
+        index = y * self.width + x
+        if not self.cleaned[index]:
+            self.cleaned[index] = 1
+            self.cleaned_cells += 1
+        if self.visits[index] < self.MAX_VISITS:
+            self.visits[index] += 1
+        self.cleaned_at[index] = self.clock() if now is None else now
+
+    def visit_count(self, x: int, y: int) -> int:
+        return self.visits[y * self.width + x] if self.contains(x, y) else 0
+
+    def last_cleaned(self, x: int, y: int) -> float:
+        """
+        :return: when the cell was last cleaned, None if it never was
+        """
+        if not self.contains(x, y) or not self.cleaned[y * self.width + x]:
+            return None
+        return self.cleaned_at[y * self.width + x]
+
+    def coverage(self, room_map=None) -> float:
+        """
+        Percentage of the cells cleaned at least once
+        :param room_map: the RoomMap of the room; if given, its obstacle cells are not counted as cleanable
+        """
+        cells = self.width * self.height
+        cleaned = self.cleaned_cells
+        if room_map is not None:
+            cells -= room_map.count_obstacles()
+            ##A cell cleaned before an obstacle was put on it no longer counts
+            cleaned -= sum(1 for x, y in room_map.obstacles_in_region(0, 0, self.width - 1, self.height - 1)
+                           if self.cleaned[y * self.width + x])
+        return 100.0 * cleaned / cells if cells > 0 else 100.0
+
+    def uncleaned_regions(self, x0: int = 0, y0: int = 0, x1: int = None, y1: int = None) -> list:
+        """
+        Cells never cleaned in the rectangle going from (x0, y0) to (x1, y1), both included (the whole room
+        by default), grouped in horizontal runs
+        :return: a list of (y, first x, last x)
+        """
+        x0, y0 = max(x0, 0), max(y0, 0)
+        x1 = self.width - 1 if x1 is None else min(x1, self.width - 1)
+        y1 = self.height - 1 if y1 is None else min(y1, self.height - 1)
+        regions = []
+        for y in range(y0, y1 + 1):
+            row = y * self.width
+            start = row + x0
+            end = row + x1 + 1
+            while start < end:
+                ##bytearray.find scans the row in C instead of testing one cell at a time
+                first = self.cleaned.find(0, start, end)
+                if first == -1:
+                    break
+                last = self.cleaned.find(1, first, end)
+                last = end if last == -1 else last
+                regions.append((y, first - row, last - 1 - row))
+                start = last
+        return regions
+
+    def views(self) -> tuple:
+        """
+        Read-only views of the visit counts and of the last cleaning times, indexed by y * width + x,
+        for pollers that must not copy the whole grid
+        """
+        return memoryview(self.visits).toreadonly(), memoryview(self.cleaned_at).toreadonly()
+
+    def clear(self) -> None:
+        self.cleaned[:] = bytes(len(self.cleaned))
+        self.visits[:] = array("H", bytes(2 * len(self.cleaned)))
+        self.cleaned_at[:] = array("d", bytes(8 * len(self.cleaned)))
+        self.cleaned_cells = 0
@@ -0,0 +1,151 @@
+import heapq
+
+from src.cleaning_robot import COMMAND_CODES, HEADING_CODES, HEADINGS, CleaningRobot, CleaningRobotError
+from src.room_map import RoomMap
+
+
+def shortest_path(room_map: RoomMap, x: int, y: int, heading: str, goal_x: int, goal_y: int,
+                  forward_cost: float = CleaningRobot.MOTOR_TIME, rotation_cost: float = CleaningRobot.MOTOR_TIME):
+    """
+    Cheapest sequence of commands taking the robot from its pose to the goal cell, avoiding the known obstacles
+    :return: the commands, or None if the goal cannot be reached
+    """
+    if not room_map.contains(goal_x, goal_y) or room_map.is_obstacle(goal_x, goal_y):
+        return None
+    start = (x, y, HEADING_CODES[heading])
+    costs = {start: 0}
+    previous = {}
+    queue = [(0, start)]
+    while queue:
+        cost, state = heapq.heappop(queue)
+        if cost > costs[state]:
+            continue
+        sx, sy, sh = state
+        if (sx, sy) == (goal_x, goal_y):
+            commands = []
+            while state != start:
+                state, command = previous[state]
+                commands.append(command)
+            commands.reverse()
+            return commands
+
+        for command in [CleaningRobot.LEFT, CleaningRobot.RIGHT, CleaningRobot.FORWARD]:
+            next_state = nx, ny, _ = CleaningRobot.next_pose(sx, sy, sh, COMMAND_CODES[command])
+            if command != CleaningRobot.FORWARD:
+                move_cost = rotation_cost
+            elif room_map.contains(nx, ny) and not room_map.is_obstacle(nx, ny):
+                move_cost = forward_cost
+            else:
+                continue
+            next_cost = cost + move_cost
+            if next_cost < costs.get(next_state, float("inf")):
+                costs[next_state] = next_cost
+                previous[next_state] = (state, command)
+                heapq.heappush(queue, (next_cost, next_state))
+    return None
+
+
+def sweep_order(width: int, height: int, along_x: bool) -> list:
+    """
+    Cells of the room in boustrophedon (lawnmower) order, lanes going along the x or the y axis
+    """
+    cells = []
+    lanes, length = (height, width) if along_x else (width, height)
+    for lane in range(lanes):
+        steps = range(length) if lane % 2 == 0 else range(length - 1, -1, -1)
+        for step in steps:
+            cells.append((step, lane) if along_x else (lane, step))
+    return cells
+
+
+class CoveragePlanner:
+    """
+    Plans routes visiting every free cell of the room, following a lawnmower pattern and joining
+    consecutive cells with the cheapest turn-aware path. A rotation takes as long as a forward move,
+    so the lanes go along the longer side of the room to limit the U-turns
+    """
+
+    def __init__(self, room_map: RoomMap):
+        self.room_map = room_map
+        self.covered = set()
+
+    def uncovered_cells(self) -> list:
+        return [(x, y) for x in range(self.room_map.width) for y in range(self.room_map.height)
+                if (x, y) not in self.covered and not self.room_map.is_obstacle(x, y)]
+
+    def plan(self, x: int, y: int, heading: str) -> list:
+        """
+        :return: the commands visiting every free cell not covered yet, starting from the given pose
+        """
+        return [command for _, _, path in self.plan_segments(x, y, heading) for command in path]
+
+    def plan_segments(self, x: int, y: int, heading: str) -> list:
+        """
+        :return: the route visiting every free cell not covered yet, as (goal cell, start pose, commands) segments
+        """
+        if not self.room_map.contains(x, y):
+            raise CleaningRobotError()
+        self.covered.add((x, y))
+        best, best_cost = None, None
+        for along_x in (True, False):
+            order = sweep_order(self.room_map.width, self.room_map.height, along_x)
+            for cells in (order, order[::-1]):
+                segments = self._plan_order(cells, x, y, heading)
+                commands = [command for _, _, path in segments for command in path]
+                ##Every command keeps a motor busy for the same time: fewer commands first, then fewer rotations
+                cost = (len(commands), len(commands) - commands.count(CleaningRobot.FORWARD))
+                if best is None or cost < best_cost:
+                    best, best_cost = segments, cost
+        return best
+
+    def _plan_order(self, cells: list, x: int, y: int, heading: str) -> list:
+        segments = []
+        visited = set(self.covered)
+        for goal_x, goal_y in cells:
+            if (goal_x, goal_y) in visited or self.room_map.is_obstacle(goal_x, goal_y):
+                continue
+            path = shortest_path(self.room_map, x, y, heading, goal_x, goal_y)
+            if path is None:
+                continue  # Enclosed by obstacles
+            segments.append(((goal_x, goal_y), (x, y, heading), path))
+            h = HEADING_CODES[heading]
+            for command in path:
+                x, y, h = CleaningRobot.next_pose(x, y, h, COMMAND_CODES[command])
+                visited.add((x, y))
+            heading = HEADINGS[h]
+        return segments
+
+    def _path_clear(self, x: int, y: int, heading: str, path: list) -> bool:
+        h = HEADING_CODES[heading]
+        for command in path:
+            x, y, h = CleaningRobot.next_pose(x, y, h, COMMAND_CODES[command])
+            if self.room_map.is_obstacle(x, y):
+                return False
+        return True
+
+    def run(self, robot: CleaningRobot) -> list:
+        """
+        Clean the whole room with the robot. The route is planned once; when a new obstacle is met only the
+        segments it affects are planned again, from where the robot stands to the goal cell of the segment
+        :return: the status returned by each executed command
+        """
+        robot.room_map = self.room_map
+        results = []
+        for (goal_x, goal_y), start, path in self.plan_segments(robot.pos_x, robot.pos_y, robot.heading):
+            while (goal_x, goal_y) not in self.covered:
+                pose = (robot.pos_x, robot.pos_y, robot.heading)
+                if pose != start or not self._path_clear(*pose, path):
+                    ##A detour left the robot elsewhere, or the segment crosses an obstacle met since it was planned
+                    start, path = pose, shortest_path(self.room_map, *pose, goal_x, goal_y)
+                    if path is None:
+                        break  # The goal is an obstacle or got enclosed
+                for command in path:
+                    result = robot.execute_command(command)
+                    results.append(result)
+                    if result.startswith("!"):
+                        return results
+                    if command == robot.FORWARD and robot.block_way:
+                        start = None
+                        break
+                    self.covered.add((robot.pos_x, robot.pos_y))
+        return results
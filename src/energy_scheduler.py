@@ -0,0 +1,148 @@
+import heapq
+
+from src.cleaning_robot import (COMMAND_CODES, HEADING_CODES, HEADINGS, NEXT_HEADING, STEP_X, STEP_Y, CleaningRobot,
+                                CleaningRobotError)
+from src.coverage_planner import shortest_path
+from src.room_map import RoomMap
+
+INFINITY = float("inf")
+
+
+class EnergyScheduler:
+    """
+    Cuts routes so that the robot can always get back to its charger before the battery drops to the
+    10% threshold below which execute_command refuses to move. Energies are in percentage points of charge
+    """
+
+    THRESHOLD = 10
+
+    def __init__(self, room_map: RoomMap, charger: tuple = (0, 0), forward_energy: float = 0.1,
+                 rotation_energy: float = 0.05, reserve: float = 1.0):
+        """
+        :param room_map: the room, with its known obstacles
+        :param charger: the cell of the charging station
+        :param forward_energy: charge used by a forward move
+        :param rotation_energy: charge used by a rotation
+        :param reserve: charge kept on top of the threshold when reaching the charger
+        """
+        if not room_map.contains(*charger):
+            raise CleaningRobotError()
+        self.room_map = room_map
+        self.charger = charger
+        self.forward_energy = forward_energy
+        self.rotation_energy = rotation_energy
+        self.reserve = reserve
+
+    def _free(self, x: int, y: int) -> bool:
+        return self.room_map.contains(x, y) and not self.room_map.is_obstacle(x, y)
+
+    def energy(self, commands) -> float:
+        forward = sum(1 for command in commands if command == CleaningRobot.FORWARD)
+        return forward * self.forward_energy + (len(commands) - forward) * self.rotation_energy
+
+    def return_energies(self) -> dict:
+        """
+        Energy needed to reach the charger from every pose (x, y, heading) of the room, computed with a single
+        backward Dijkstra search from the charger. A pose missing from the result cannot reach the charger
+        """
+        energies = {}
+        if not self._free(*self.charger):
+            return energies  # The charger cell is marked as an obstacle: nothing can reach it
+        queue = []
+        for heading in range(4):
+            energies[(self.charger[0], self.charger[1], heading)] = 0
+            queue.append((0, (self.charger[0], self.charger[1], heading)))
+        while queue:
+            energy, (x, y, heading) = heapq.heappop(queue)
+            if energy > energies[(x, y, heading)]:
+                continue
+            ##Turning right from heading - 1 or left from heading + 1 gives heading
+            predecessors = [((x, y, NEXT_HEADING[heading * 3 + COMMAND_CODES[command]]), self.rotation_energy)
+                            for command in [CleaningRobot.RIGHT, CleaningRobot.LEFT]]
+            px, py = x - STEP_X[heading * 3], y - STEP_Y[heading * 3]
+            if self._free(px, py):
+                predecessors.append(((px, py, heading), self.forward_energy))
+            for predecessor, move_energy in predecessors:
+                if energy + move_energy < energies.get(predecessor, INFINITY):
+                    energies[predecessor] = energy + move_energy
+                    heapq.heappush(queue, (energy + move_energy, predecessor))
+        return energies
+
+    def schedule(self, commands, x: int, y: int, heading: str, charge: float, go_back: bool = False) -> list:
+        """
+        Keep the longest part of the route after which the robot can still reach the charger with
+        more than the threshold plus the reserve; if the route had to be cut, append the way back
+        :param go_back: append the way back to the charger even if the whole route is kept
+        :return: the commands to execute
+        """
+        kept, pose = self._cut(commands, x, y, heading, charge)
+        route = list(commands[:kept])
+        if kept < len(commands) or go_back:
+            route += self._way_back(pose)
+        return route
+
+    def _way_back(self, pose: tuple) -> list:
+        x, y, h = pose
+        path = shortest_path(self.room_map, x, y, HEADINGS[h], self.charger[0], self.charger[1],
+                             self.forward_energy, self.rotation_energy)
+        if path is None:
+            raise CleaningRobotError()  # The charger cannot be reached from the pose
+        return path
+
+    def _cut(self, commands, x: int, y: int, heading: str, charge: float) -> tuple:
+        """
+        :return: how many commands can be kept, and the pose the robot is in after them
+        """
+        return_energies = self.return_energies()
+        budget = charge - self.THRESHOLD - self.reserve
+        h = HEADING_CODES[heading]
+        if budget < return_energies.get((x, y, h), INFINITY):
+            raise CleaningRobotError()  # Not even enough charge to go back
+
+        spent = 0
+        kept = 0
+        kept_pose = (x, y, h)
+        for command in commands:
+            if command not in COMMAND_CODES:
+                raise CleaningRobotError()
+            nx, ny, nh = CleaningRobot.next_pose(x, y, h, COMMAND_CODES[command])
+            if command != CleaningRobot.FORWARD:
+                h = nh
+                spent += self.rotation_energy
+            elif self._free(nx, ny):
+                x, y = nx, ny
+                spent += self.forward_energy
+            if spent + return_energies.get((x, y, h), INFINITY) > budget:
+                break
+            kept += 1
+            kept_pose = (x, y, h)
+        return kept, kept_pose
+
+    def run(self, robot: CleaningRobot, commands) -> list:
+        """
+        Execute a route with the robot, cutting it when needed to get back to the charger.
+        When a new obstacle is found, the rest of the route is scheduled again with a fresh battery reading
+        :return: the status returned by each executed command
+        """
+        robot.room_map = self.room_map
+        remaining = list(commands)
+        go_back = False
+        results = []
+        while True:
+            kept, pose = self._cut(remaining, robot.pos_x, robot.pos_y, robot.heading, robot.battery.charge_left())
+            route = remaining[:kept]
+            if kept < len(remaining) or go_back:
+                route += self._way_back(pose)
+            for step, command in enumerate(route):
+                result = robot.execute_command(command)
+                results.append(result)
+                if result.startswith("!"):
+                    return results
+                if command == robot.FORWARD and robot.block_way:
+                    if step < kept:
+                        remaining = remaining[step + 1:]
+                    else:  # Blocked on the way back to the charger
+                        remaining, go_back = [], True
+                    break
+            else:
+                return results
@@ -0,0 +1,113 @@
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable
+
+from src.backends import SimulatedBackend
+from src.cleaning_robot import CleaningRobot
+
+
+class FleetJob:
+    """
+    A robot to simulate: the room it moves in, where it starts and the route it receives from the RMS
+    """
+
+    def __init__(self, route: str, width: int, height: int, obstacles: Iterable = (), start: tuple = (0, 0, CleaningRobot.N),
+                 charge: float = 100, forward_discharge: float = 0.1, rotation_discharge: float = 0.05):
+        self.route = route
+        self.width = width
+        self.height = height
+        self.obstacles = frozenset(obstacles)
+        self.start = start
+        self.charge = charge
+        self.forward_discharge = forward_discharge
+        self.rotation_discharge = rotation_discharge
+
+
+def create_robot(job: FleetJob) -> CleaningRobot:
+    """
+    Build a robot with its own simulated hardware: the infrared sensor looks at the cell in front
+    of the robot in the job's room, and every motor activation drains the battery
+    """
+    backend = SimulatedBackend(job.charge, {CleaningRobot.PWMA: job.forward_discharge,
+                                            CleaningRobot.PWMB: job.rotation_discharge})
+    robot = CleaningRobot(backend)
+    robot.pos_x, robot.pos_y, robot.heading = job.start
+
+    def front_blocked() -> bool:
+        x, y = robot.neighbour_cell(robot.pos_x, robot.pos_y, robot.heading)
+        inside = 0 <= x < job.width and 0 <= y < job.height
+        return not inside or (x, y) in job.obstacles
+
+    backend.gpio.set_input_source(CleaningRobot.INFRARED_PIN, front_blocked)
+    return robot
+
+
+def simulate_robot(job: FleetJob) -> dict:
+    """
+    Run the route of a job on its own robot
+    :return: the statistics of the run
+    """
+    robot = create_robot(job)
+    start = time.perf_counter()
+    commands = forward_moves = blocked_moves = 0
+    depleted = False
+    for command in job.route:
+        result = robot.execute_command(command)
+        if result.startswith("!"):
+            depleted = True
+            break
+        commands += 1
+        if command == robot.FORWARD:
+            if robot.block_way:
+                blocked_moves += 1
+            else:
+                forward_moves += 1
+    return {"commands": commands,
+            "forward_moves": forward_moves,
+            "blocked_moves": blocked_moves,
+            "battery_depleted": depleted,
+            "charge_left": robot.ibs.get_charge_left(),
+            "final_pose": (robot.pos_x, robot.pos_y, robot.heading),
+            "projected_duration": robot.clock.elapsed(),
+            "motor_duty_cycle": robot.clock.duty_cycle("wheel_motor", "rotation_motor"),
+            "elapsed": time.perf_counter() - start}
+
+
+def run_fleet(jobs: Iterable[FleetJob], max_workers: int = None, chunksize: int = 16) -> dict:
+    """
+    Simulate every job on a pool of processes and aggregate the results
+    :param jobs: the robots to simulate
+    :param max_workers: number of processes (None: one per CPU)
+    :param chunksize: number of jobs sent to a process at once
+    :return: the aggregated statistics, plus the statistics of each robot under "robots"
+    """
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        reports = list(executor.map(simulate_robot, jobs, chunksize=chunksize))
+    elapsed = time.perf_counter() - start
+
+    commands = sum(report["commands"] for report in reports)
+    return {"robots": reports,
+            "robot_count": len(reports),
+            "commands": commands,
+            "forward_moves": sum(report["forward_moves"] for report in reports),
+            "blocked_moves": sum(report["blocked_moves"] for report in reports),
+            "battery_depleted": sum(1 for report in reports if report["battery_depleted"]),
+            "elapsed": elapsed,
+            "commands_per_second": commands / elapsed if elapsed > 0 else 0.0}
+
+
+def random_jobs(count: int, width: int, height: int, route_length: int, obstacle_density: float = 0.1,
+                seed: int = None, **job_options) -> list:
+    """
+    Build count jobs with random routes and random obstacles, every robot starting in (0, 0)
+    """
+    rng = random.Random(seed)
+    cells = [(x, y) for x in range(width) for y in range(height) if (x, y) != (0, 0)]
+    jobs = []
+    for _ in range(count):
+        obstacles = rng.sample(cells, int(len(cells) * obstacle_density))
+        route = "".join(rng.choice("fffflr") for _ in range(route_length))
+        jobs.append(FleetJob(route, width, height, obstacles, **job_options))
+    return jobs
@@ -0,0 +1,56 @@
+##Opt-in features (instrumentation, journal, sensor sampler) wrap the methods and devices of a robot.
+##Several of them may wrap the same one, and each must remove only its own wrapper, in any order
+
+
+class MethodHook:
+    """
+    Callable installed on a robot in place of one of its methods; it calls function(original, *args, **kwargs)
+    """
+
+    def __init__(self, function, original, replaced_instance_attribute: bool):
+        self.function = function
+        self.original = original
+        ##Whether original was set on the robot itself (e.g. another hook) rather than being the class method
+        self.replaced_instance_attribute = replaced_instance_attribute
+
+    def __call__(self, *args, **kwargs):
+        return self.function(self.original, *args, **kwargs)
+
+
+def install_method_hook(robot, name: str, function) -> MethodHook:
+    hook = MethodHook(function, getattr(robot, name), name in robot.__dict__)
+    setattr(robot, name, hook)
+    return hook
+
+
+def remove_method_hook(robot, name: str, hook: MethodHook) -> None:
+    current = robot.__dict__.get(name)
+    if current is hook:
+        if hook.replaced_instance_attribute:
+            setattr(robot, name, hook.original)
+        else:
+            del robot.__dict__[name]
+        return
+    ##Installed before another hook: unlink it from the chain
+    while isinstance(current, MethodHook):
+        if current.original is hook:
+            current.original = hook.original
+            current.replaced_instance_attribute = hook.replaced_instance_attribute
+            return
+        current = current.original
+
+
+def remove_proxy(owner, name: str, proxy) -> None:
+    """
+    Unlink a proxy from the chain of objects found at owner.<name>, where every proxy keeps the object
+    it wraps under the same attribute name (e.g. robot.battery.ibs.ibs)
+    """
+    holder = owner
+    while True:
+        current = getattr(holder, "__dict__", {}).get(name)
+        if current is None:
+            return
+        if current is proxy:
+            setattr(holder, name, getattr(proxy, name))
+            return
+        holder = current
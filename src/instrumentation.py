@@ -0,0 +1,169 @@
+import bisect
+import json
+from typing import Callable
+
+from src.hooks import install_method_hook, remove_method_hook, remove_proxy
+from src.pin_shadow import PinShadow
+
+
+class Histogram:
+    """
+    Latency histogram with fixed bucket bounds (seconds), as used by Prometheus
+    """
+
+    BOUNDS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 2.5, 5.0)
+
+    def __init__(self):
+        self.counts = [0] * (len(self.BOUNDS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(self.BOUNDS, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+
+    def cumulative_counts(self) -> list:
+        counts = []
+        total = 0
+        for count in self.counts:
+            total += count
+            counts.append(total)
+        return counts
+
+
+class _CountingGPIO:
+    ##Counts the pin writes reaching the GPIO library; everything else is taken from the wrapped module
+
+    def __init__(self, gpio, instrumentation):
+        self.gpio = gpio
+        self.instrumentation = instrumentation
+
+    def __getattr__(self, name):
+        return getattr(self.gpio, name)
+
+    def output(self, channel, value) -> None:
+        self.instrumentation.counters["gpio_writes"] += len(channel) if isinstance(channel, (list, tuple)) else 1
+        self.gpio.output(channel, value)
+
+
+class _TimedIBS:
+    ##on_read (taken over from the BatteryMonitor) is called within the measure, so the bus latency is included
+
+    def __init__(self, ibs, histogram: Histogram, now: Callable[[], float], on_read: Callable[[], None] = None):
+        self.ibs = ibs
+        self.histogram = histogram
+        self.now = now
+        self.on_read = on_read
+
+    def __getattr__(self, name):
+        return getattr(self.ibs, name)
+
+    def get_charge_left(self):
+        start = self.now()
+        try:
+            if self.on_read is not None:
+                self.on_read()
+            return self.ibs.get_charge_left()
+        finally:
+            self.histogram.observe(self.now() - start)
+
+
+class Instrumentation:
+    """
+    Opt-in measures of a CleaningRobot. attach() wraps the methods and devices of one robot,
+    so a robot without instrumentation runs exactly the same code as before. The latencies are
+    taken from the clock of the robot, so they are simulated times on a VirtualClock
+    """
+
+    PREFIX = "cleaning_robot_"
+
+    def __init__(self):
+        self.histograms = {"execute_command": Histogram(),
+                           "wheel_motor": Histogram(),
+                           "rotation_motor": Histogram(),
+                           "ibs_read": Histogram()}
+        self.counters = {"commands": 0, "gpio_writes": 0, "obstacle_hits": 0}
+        self.robot = None
+        self.hooks = {}
+        self.gpio = None
+        self.ibs = None
+
+    def attach(self, robot) -> "Instrumentation":
+        self.robot = robot
+        self.gpio = _CountingGPIO(robot.gpio.gpio if isinstance(robot.gpio, PinShadow) else robot.gpio, self)
+        if isinstance(robot.gpio, PinShadow):
+            ##Only the writes the shadow lets through reach the bus
+            robot.gpio.gpio = self.gpio
+        else:
+            robot.gpio = self.gpio
+        self.ibs = _TimedIBS(robot.battery.ibs, self.histograms["ibs_read"], robot.clock.now, robot.battery.on_read)
+        robot.battery.ibs = self.ibs
+        robot.battery.on_read = None
+
+        self.hooks = {name: install_method_hook(robot, name, self._timed(self.histograms[histogram], robot.clock.now))
+                      for name, histogram in [("execute_command", "execute_command"),
+                                              ("activate_wheel_motor", "wheel_motor"),
+                                              ("activate_rotation_motor", "rotation_motor")]}
+
+        def counted_execute_command(execute, command, charge_left):
+            result = execute(command, charge_left)
+            self.counters["commands"] += 1
+            if command == robot.FORWARD and robot.last_command_blocked:
+                self.counters["obstacle_hits"] += 1
+            return result
+
+        self.hooks["_execute_command"] = install_method_hook(robot, "_execute_command", counted_execute_command)
+        return self
+
+    def detach(self) -> None:
+        robot = self.robot
+        for name, hook in self.hooks.items():
+            remove_method_hook(robot, name, hook)
+        remove_proxy(robot, "gpio", self.gpio)
+        remove_proxy(robot.battery, "ibs", self.ibs)
+        if self.ibs.on_read is not None:
+            robot.battery.on_read = self.ibs.on_read
+        self.robot = None
+
+    @staticmethod
+    def _timed(histogram: Histogram, now: Callable[[], float]):
+        def timed(function, *args, **kwargs):
+            start = now()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                histogram.observe(now() - start)
+        return timed
+
+    def to_json(self) -> dict:
+        return {"histograms": {name: {"bounds": list(Histogram.BOUNDS), "counts": histogram.counts,
+                                      "sum": histogram.sum, "count": histogram.count}
+                               for name, histogram in self.histograms.items()},
+                "counters": dict(self.counters)}
+
+    def to_prometheus(self) -> str:
+        lines = []
+        for name, histogram in self.histograms.items():
+            metric = self.PREFIX + name + "_seconds"
+            lines.append("# TYPE " + metric + " histogram")
+            bounds = [repr(bound) for bound in Histogram.BOUNDS] + ["+Inf"]
+            for bound, count in zip(bounds, histogram.cumulative_counts()):
+                lines.append(metric + '_bucket{le="' + bound + '"} ' + str(count))
+            lines.append(metric + "_sum " + repr(histogram.sum))
+            lines.append(metric + "_count " + str(histogram.count))
+        for name, value in self.counters.items():
+            metric = self.PREFIX + name + "_total"
+            lines.append("# TYPE " + metric + " counter")
+            lines.append(metric + " " + str(value))
+        return "\n".join(lines) + "\n"
+
+    def export(self, path: str) -> None:
+        """
+        Write the measures to a file, as JSON if its name ends with .json, as Prometheus text otherwise
+        """
+        with open(path, "w") as export_file:
+            if path.endswith(".json"):
+                json.dump(self.to_json(), export_file, indent=2)
+            else:
+                export_file.write(self.to_prometheus())
@@ -0,0 +1,154 @@
+import math
+import struct
+import time
+from collections import namedtuple
+
+from src.backends import SimulatedBackend
+from src.cleaning_robot import COMMANDS, HEADING_CODES, HEADINGS, CleaningRobot, CleaningRobotError
+from src.hooks import install_method_hook, remove_method_hook, remove_proxy
+
+MAGIC = b"CRJ1"
+##Header: magic, starting x (int32), starting y (int32), starting heading (uint8)
+HEADER = struct.Struct("<4siiB")
+##Entry: command (uint8), infrared reading (uint8), IBS reading (float32), x (int32), y (int32), heading (uint8), outcome (uint8)
+ENTRY = struct.Struct("<BBfiiBB")
+
+NOT_READ = 255  # Command, infrared reading or heading not available; NaN for the IBS reading
+
+##Outcome of a command: executed, stopped by an obstacle, or refused because of low battery
+EXECUTED = 0
+BLOCKED = 1
+REFUSED = 2
+
+JournalEntry = namedtuple("JournalEntry", ["command", "infrared", "battery", "x", "y", "heading", "blocked", "refused"])
+
+
+class _JournaledIBS:
+
+    def __init__(self, ibs, journal: "Journal"):
+        self.ibs = ibs
+        self.journal = journal
+
+    def __getattr__(self, name):
+        return getattr(self.ibs, name)
+
+    def get_charge_left(self):
+        self.journal.battery_reading = self.ibs.get_charge_left()
+        return self.journal.battery_reading
+
+
+class Journal:
+    """
+    Append-only binary log of the commands executed by a robot, with the infrared and IBS readings
+    they caused and the pose reached after each of them
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.file = None
+        self.robot = None
+        self.hooks = {}
+        self.ibs = None
+        self.entries = 0
+        self.infrared_reading = NOT_READ
+        self.battery_reading = math.nan
+
+    def attach(self, robot: CleaningRobot) -> "Journal":
+        self.robot = robot
+        self.file = open(self.path, "ab")
+        if self.file.tell() == 0:
+            heading = HEADING_CODES.get(robot.heading, NOT_READ)
+            self.file.write(HEADER.pack(MAGIC, robot.pos_x or 0, robot.pos_y or 0, heading))
+
+        def journaled_obstacle_found(obstacle_found):
+            found = obstacle_found()
+            self.infrared_reading = 1 if found else 0
+            return found
+
+        def journaled_execute_command(execute, command, charge_left):
+            result = execute(command, charge_left)
+            self.write(command, result)
+            return result
+
+        self.hooks = {"obstacle_found": install_method_hook(robot, "obstacle_found", journaled_obstacle_found),
+                      "_execute_command": install_method_hook(robot, "_execute_command", journaled_execute_command)}
+        self.ibs = _JournaledIBS(robot.battery.ibs, self)
+        robot.battery.ibs = self.ibs
+        return self
+
+    def write(self, command: str, result: str) -> None:
+        """
+        :param result: the status returned by the command
+        """
+        robot = self.robot
+        code = COMMANDS.index(command) if command in COMMANDS else NOT_READ
+        heading = HEADING_CODES.get(robot.heading, NOT_READ)
+        ##The outcome, not block_way: an obstacle may come from the room map, a refusal from an estimated charge
+        outcome = REFUSED if result.startswith("!") else BLOCKED if robot.last_command_blocked else EXECUTED
+        self.file.write(ENTRY.pack(code, self.infrared_reading, self.battery_reading, robot.pos_x or 0, robot.pos_y or 0,
+                                   heading, outcome))
+        self.entries += 1
+        self.infrared_reading = NOT_READ
+        self.battery_reading = math.nan
+
+    def flush(self) -> None:
+        self.file.flush()
+
+    def close(self) -> None:
+        """
+        Stop journaling the robot and close the file
+        """
+        if self.robot is not None:
+            for name, hook in self.hooks.items():
+                remove_method_hook(self.robot, name, hook)
+            remove_proxy(self.robot.battery, "ibs", self.ibs)
+            self.robot = None
+        self.file.close()
+
+
+def read_journal(path: str) -> tuple:
+    """
+    :return: the starting pose (x, y, heading) and the list of JournalEntry of a journal
+    """
+    with open(path, "rb") as journal_file:
+        data = journal_file.read()
+    if len(data) < HEADER.size or data[:len(MAGIC)] != MAGIC:
+        raise CleaningRobotError()
+    _, x, y, heading = HEADER.unpack_from(data)
+    body = memoryview(data)[HEADER.size:]
+    body = body[:len(body) - len(body) % ENTRY.size]  # Ignore an entry cut short by a crash
+    entries = []
+    for code, infrared, battery, ex, ey, eh, outcome in ENTRY.iter_unpack(body):
+        entries.append(JournalEntry(COMMANDS[code] if code != NOT_READ else None,
+                                    None if infrared == NOT_READ else bool(infrared),
+                                    None if math.isnan(battery) else battery,
+                                    ex, ey, HEADINGS[eh] if eh != NOT_READ else None,
+                                    outcome == BLOCKED, outcome == REFUSED))
+    return (x, y, HEADINGS[heading] if heading != NOT_READ else None), entries
+
+
+def replay(path: str) -> dict:
+    """
+    Execute the commands of a journal again on a simulated robot fed with the recorded infrared readings.
+    A forward move decided without reading the sensor (the obstacle was known from the room map) gets its
+    recorded outcome as reading, and every command runs with a charge above or below the threshold as
+    recorded, as the charge may have been estimated rather than read. The motors take no time, so a journal
+    replays at full speed
+    :return: the number of replayed commands, the steps whose pose differs from the recorded one and the time taken
+    """
+    start_pose, entries = read_journal(path)
+    backend = SimulatedBackend()
+    robot = CleaningRobot(backend)
+    robot.pos_x, robot.pos_y, robot.heading = start_pose
+    mismatches = []
+    start = time.perf_counter()
+    for step, entry in enumerate(entries):
+        if entry.infrared is not None:
+            backend.gpio.set_input(CleaningRobot.INFRARED_PIN, entry.infrared)
+        elif entry.command == CleaningRobot.FORWARD:
+            backend.gpio.set_input(CleaningRobot.INFRARED_PIN, entry.blocked)
+        result = robot._execute_command(entry.command, 0 if entry.refused else 100)
+        if ((robot.pos_x, robot.pos_y, robot.heading, robot.last_command_blocked, result.startswith("!"))
+                != (entry.x, entry.y, entry.heading, entry.blocked, entry.refused)):
+            mismatches.append(step)
+    return {"commands": len(entries), "mismatches": mismatches, "elapsed": time.perf_counter() - start}
@@ -0,0 +1,151 @@
+import heapq
+
+from src.cleaning_robot import (COMMAND_CODES, HEADING_CODES, NEXT_HEADING, STEP_X, STEP_Y, CleaningRobot,
+                                CleaningRobotError)
+from src.room_map import RoomMap
+
+INFINITY = float("inf")
+
+##Virtual node reached for free from the goal cell with any heading, so that the goal is a cell and not a pose
+GOAL = "goal"
+
+
+class DStarLite:
+    """
+    D* Lite search over the robot poses (x, y, heading) of a room, from the current pose to a goal cell.
+    Forward moves and rotations have their own cost. The search goes backwards from the goal, so when
+    an obstacle is found only the part of the plan depending on it is repaired
+    """
+
+    def __init__(self, room_map: RoomMap, goal_x: int, goal_y: int, forward_cost: float = CleaningRobot.MOTOR_TIME,
+                 rotation_cost: float = CleaningRobot.MOTOR_TIME):
+        if not room_map.contains(goal_x, goal_y):
+            raise CleaningRobotError()
+        self.room_map = room_map
+        self.goal = (goal_x, goal_y)
+        self.forward_cost = forward_cost
+        self.rotation_cost = rotation_cost
+
+        self.start = None
+        self.last = None
+        self.km = 0
+        self.g = {}
+        self.rhs = {GOAL: 0}
+        self.queue = []
+        self.open = {}
+        self.pushes = 0
+        self.expansions = 0
+
+    def set_start(self, x: int, y: int, heading: str) -> None:
+        start = (x, y, HEADING_CODES[heading])
+        if self.start is None:
+            self.last = start
+            self._push(GOAL, self._key(GOAL, start))
+        self.start = start
+
+    def add_obstacle(self, x: int, y: int, now: float = None) -> None:
+        """
+        Take into account an obstacle found in a cell, updating the poses that could move into it
+        :param now: when the obstacle was found, on the robot's clock (see RoomMap.mark_obstacle)
+        """
+        self.room_map.mark_obstacle(x, y, now)
+        self.km += self._heuristic(self.last, self.start)
+        self.last = self.start
+        for heading in range(4):
+            ##The pose one forward move away from the obstacle
+            px, py = x - STEP_X[heading * 3], y - STEP_Y[heading * 3]
+            if self._free(px, py):
+                self._update_vertex((px, py, heading))
+
+    def next_command(self) -> str:
+        """
+        :return: the first command of the cheapest route from the start to the goal
+        """
+        self._compute_shortest_path()
+        if self._get_g(self.start) == INFINITY:
+            raise CleaningRobotError()
+        best_command, best_cost = None, INFINITY
+        for node, command, cost in self._successors(self.start):
+            if node != GOAL and cost + self._get_g(node) < best_cost:
+                best_command, best_cost = command, cost + self._get_g(node)
+        return best_command
+
+    def _heuristic(self, a, b) -> float:
+        a = self.goal if a == GOAL else a
+        b = self.goal if b == GOAL else b
+        return (abs(a[0] - b[0]) + abs(a[1] - b[1])) * self.forward_cost
+
+    def _get_g(self, node) -> float:
+        return self.g.get(node, INFINITY)
+
+    def _get_rhs(self, node) -> float:
+        return self.rhs.get(node, INFINITY)
+
+    def _key(self, node, start=None) -> tuple:
+        smallest = min(self._get_g(node), self._get_rhs(node))
+        return smallest + self._heuristic(start or self.start, node) + self.km, smallest
+
+    def _free(self, x: int, y: int) -> bool:
+        return self.room_map.contains(x, y) and not self.room_map.is_obstacle(x, y)
+
+    def _successors(self, node) -> list:
+        x, y, heading = node
+        successors = [(CleaningRobot.next_pose(x, y, heading, COMMAND_CODES[command]), command, self.rotation_cost)
+                      for command in [CleaningRobot.LEFT, CleaningRobot.RIGHT]]
+        forward = CleaningRobot.next_pose(x, y, heading, COMMAND_CODES[CleaningRobot.FORWARD])
+        if self._free(forward[0], forward[1]):
+            successors.append((forward, CleaningRobot.FORWARD, self.forward_cost))
+        if (x, y) == self.goal:
+            successors.append((GOAL, None, 0))
+        return successors
+
+    def _predecessors(self, node) -> list:
+        if node == GOAL:
+            return [(self.goal[0], self.goal[1], heading) for heading in range(4)]
+        x, y, heading = node
+        ##Turning right from heading - 1 or left from heading + 1 gives heading
+        predecessors = [(x, y, NEXT_HEADING[heading * 3 + COMMAND_CODES[command]])
+                        for command in [CleaningRobot.RIGHT, CleaningRobot.LEFT]]
+        px, py = x - STEP_X[heading * 3], y - STEP_Y[heading * 3]
+        if self._free(x, y) and self._free(px, py):
+            predecessors.append((px, py, heading))
+        return predecessors
+
+    def _push(self, node, key: tuple) -> None:
+        self.open[node] = key
+        self.pushes += 1  # Breaks ties between equal keys, as GOAL and the poses cannot be compared
+        heapq.heappush(self.queue, (key, self.pushes, node))
+
+    def _top(self):
+        ##Entries replaced or removed from self.open are dropped lazily here
+        while self.queue and self.open.get(self.queue[0][2]) != self.queue[0][0]:
+            heapq.heappop(self.queue)
+        return (self.queue[0][0], self.queue[0][2]) if self.queue else ((INFINITY, INFINITY), None)
+
+    def _update_vertex(self, node) -> None:
+        if node != GOAL:
+            self.rhs[node] = min((cost + self._get_g(successor) for successor, _, cost in self._successors(node)),
+                                 default=INFINITY)
+        self.open.pop(node, None)
+        if self._get_g(node) != self._get_rhs(node):
+            self._push(node, self._key(node))
+
+    def _compute_shortest_path(self) -> None:
+        while True:
+            top_key, node = self._top()
+            if node is None or (top_key >= self._key(self.start)
+                                and self._get_rhs(self.start) == self._get_g(self.start)):
+                return
+            self.expansions += 1
+            new_key = self._key(node)
+            if top_key < new_key:
+                self._push(node, new_key)
+            elif self._get_g(node) > self._get_rhs(node):
+                self.g[node] = self._get_rhs(node)
+                del self.open[node]
+                for predecessor in self._predecessors(node):
+                    self._update_vertex(predecessor)
+            else:
+                self.g[node] = INFINITY
+                for predecessor in self._predecessors(node) + [node]:
+                    self._update_vertex(predecessor)
@@ -0,0 +1,56 @@
+class PinShadow:
+    """
+    Wrapper around the GPIO module remembering the last value written on every output pin.
+    Writes that would not change a pin are suppressed, and the pins changed together are sent
+    with a single GPIO.output(channels, values) call. Any other attribute is taken from the
+    wrapped module, so a PinShadow can be used wherever the GPIO module is
+    """
+
+    def __init__(self, gpio):
+        self.gpio = gpio
+        self.pin_state = {}
+
+        self.writes_issued = 0
+        self.writes_suppressed = 0
+        self.batches_issued = 0
+
+    def __getattr__(self, name):
+        return getattr(self.gpio, name)
+
+    def output(self, channel, value) -> None:
+        self.output_many([channel], [value])
+
+    def output_many(self, channels: list, values: list) -> None:
+        changed_channels = []
+        changed_values = []
+        for channel, value in zip(channels, values):
+            if self.pin_state.get(channel) == bool(value):
+                self.writes_suppressed += 1
+            else:
+                changed_channels.append(channel)
+                changed_values.append(value)
+        if not changed_channels:
+            return
+
+        if len(changed_channels) == 1:
+            self.gpio.output(changed_channels[0], changed_values[0])
+        else:
+            self.gpio.output(changed_channels, changed_values)
+        for channel, value in zip(changed_channels, changed_values):
+            self.pin_state[channel] = bool(value)
+        self.writes_issued += len(changed_channels)
+        self.batches_issued += 1
+
+    def invalidate(self, channel=None) -> None:
+        """
+        Forget the value of a pin (or of every pin), e.g. after something else wrote it
+        """
+        if channel is None:
+            self.pin_state.clear()
+        else:
+            self.pin_state.pop(channel, None)
+
+    def stats(self) -> dict:
+        return {"writes_issued": self.writes_issued,
+                "writes_suppressed": self.writes_suppressed,
+                "batches_issued": self.batches_issued}
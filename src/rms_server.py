@@ -0,0 +1,190 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from src.cleaning_robot import COMMANDS, CleaningRobot, CleaningRobotError
+
+
+class RMSServer:
+    """
+    Line-based asyncio server driving a robot for the RMS, over TCP or a Unix socket.
+
+    A command connection sends one command per line ("f", "l" or "r") and may pipeline as many as it
+    wants: each line gets its response line, in order. The response is the status returned by
+    execute_command, "ERR <line>" for an unknown command, "ERR <exception>" for a command that failed or
+    "ERR line too long" for a line longer than the limit of the stream reader, which is skipped.
+    Commands from every connection run one at a time, in order, on a worker thread, so the event loop
+    keeps serving the other connections meanwhile. The command queue and the responses
+    waiting to be sent are bounded: when either is full the server stops reading from the connection,
+    which pushes back on the sender.
+
+    A connection whose first line is "OBSERVE" instead receives one telemetry line per executed command:
+    "<sequence> <command> <status> battery=<charge> cleaning=<0|1> recharge=<0|1> buzzer=<0|1>".
+    An observer whose queue is full is disconnected rather than allowed to slow the robot down
+    """
+
+    OBSERVE = "OBSERVE"
+    TOO_LONG = "line too long"
+
+    def __init__(self, robot: CleaningRobot, queue_size: int = 64, observer_queue_size: int = 256):
+        """
+        :param robot: the robot to drive
+        :param queue_size: commands waiting to be executed, and responses waiting to be sent on each connection
+        :param observer_queue_size: telemetry lines waiting to be sent to each observer
+        """
+        if queue_size < 1 or observer_queue_size < 1:
+            raise CleaningRobotError()
+        self.robot = robot
+        self.queue_size = queue_size
+        self.observer_queue_size = observer_queue_size
+        self.commands = None
+        self.observers = set()
+        self.servers = []
+        self.runner = None
+        ##A single worker thread executes the commands in the order they were queued. It is kept when the
+        ##server is closed, so that the server can be started again for the same robot
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.executed = 0
+        self.dropped_observers = 0
+
+    async def start_tcp(self, host: str = "127.0.0.1", port: int = 0) -> tuple:
+        """
+        :return: the address the server listens on, e.g. ("127.0.0.1", 50123) with port 0
+        """
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        self._started(server)
+        return server.sockets[0].getsockname()[:2]
+
+    async def start_unix(self, path: str) -> None:
+        self._started(await asyncio.start_unix_server(self.handle_connection, path))
+
+    def _started(self, server) -> None:
+        self.servers.append(server)
+        if self.runner is None:
+            self.commands = asyncio.Queue(self.queue_size)
+            self.runner = asyncio.ensure_future(self._run_commands())
+
+    async def close(self) -> None:
+        for server in self.servers:
+            server.close()
+            await server.wait_closed()
+        self.servers = []
+        if self.runner is not None:
+            self.runner.cancel()
+            self.runner = None
+        for queue in list(self.observers):
+            self._disconnect_observer(queue)
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            line = await self._read_line(reader)
+            if line is not None and line.strip() == self.OBSERVE.encode():
+                await self._serve_observer(writer)
+            else:
+                await self._serve_commands(line, reader, writer)
+        except ConnectionError:
+            pass  # The client went away, nothing to answer
+        finally:
+            writer.close()
+
+    async def _serve_commands(self, line: bytes, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        loop = asyncio.get_running_loop()
+        pending = asyncio.Queue(self.queue_size)
+        responder = asyncio.ensure_future(self._send_responses(pending, writer))
+        try:
+            while line != b"":
+                command = self.TOO_LONG if line is None else line.decode(errors="replace").strip()
+                if command:
+                    response = loop.create_future()
+                    await pending.put(response)
+                    if command in COMMANDS:
+                        await self.commands.put((command, response))
+                    else:
+                        response.set_result("ERR " + command)
+                line = await self._read_line(reader)
+            await pending.put(None)
+            await responder
+        finally:
+            responder.cancel()
+
+    @staticmethod
+    async def _read_line(reader: asyncio.StreamReader):
+        """
+        :return: the next line, b"" once the connection is closed, or None for a line longer than the
+        limit of the reader, whose bytes are dropped up to its newline
+        """
+        try:
+            return await reader.readuntil(b"\n")
+        except asyncio.IncompleteReadError as error:
+            return error.partial  # Last line, without its newline
+        except asyncio.LimitOverrunError as error:
+            consumed = error.consumed
+        while True:
+            try:
+                await reader.readexactly(consumed)
+                await reader.readuntil(b"\n")
+                return None
+            except asyncio.IncompleteReadError:
+                return None
+            except asyncio.LimitOverrunError as error:
+                consumed = error.consumed
+
+    async def _send_responses(self, pending: asyncio.Queue, writer: asyncio.StreamWriter) -> None:
+        while True:
+            response = await pending.get()
+            if response is None:
+                return
+            writer.write((await response + "\n").encode())
+            await writer.drain()
+
+    async def _run_commands(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            command, response = await self.commands.get()
+            try:
+                status, telemetry = await loop.run_in_executor(self.executor, self._execute, command)
+            except Exception as error:  # e.g. an OSError from the I2C bus: answer it and keep serving
+                status, telemetry = "ERR " + type(error).__name__ + ": " + str(error), None
+            if not response.done():
+                response.set_result(status)
+            if telemetry is not None:
+                self._broadcast(telemetry)
+
+    def _execute(self, command: str) -> tuple:
+        ##Runs on the worker thread; the telemetry is taken right after the command, before the next one starts
+        robot = self.robot
+        status = robot.execute_command(command)
+        self.executed += 1
+        battery = robot.battery.last_reading
+        telemetry = (str(self.executed) + " " + command + " " + status
+                     + " battery=" + ("?" if battery is None else str(int(battery)))
+                     + " cleaning=" + str(int(robot.cleaning_system_on))
+                     + " recharge=" + str(int(robot.recharge_led_on))
+                     + " buzzer=" + str(int(robot.buzzer_on)))
+        return status, telemetry
+
+    def _broadcast(self, telemetry: str) -> None:
+        for queue in list(self.observers):
+            try:
+                queue.put_nowait(telemetry)
+            except asyncio.QueueFull:
+                self.dropped_observers += 1
+                self._disconnect_observer(queue)
+
+    def _disconnect_observer(self, queue: asyncio.Queue) -> None:
+        self.observers.discard(queue)
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(None)
+
+    async def _serve_observer(self, writer: asyncio.StreamWriter) -> None:
+        queue = asyncio.Queue(self.observer_queue_size)
+        self.observers.add(queue)
+        try:
+            while True:
+                telemetry = await queue.get()
+                if telemetry is None:
+                    return
+                writer.write((telemetry + "\n").encode())
+                await writer.drain()
+        finally:
+            self.observers.discard(queue)
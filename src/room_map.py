@@ -0,0 +1,95 @@
+import time
+from array import array
+from typing import Callable
+
+from src.cleaning_robot import CleaningRobotError
+
+
+class RoomMap:
+    """
+    Occupancy grid of the room. Cell (x, y) is stored at index y * width + x, with one byte telling
+    whether it contains an obstacle and one timestamp telling when that obstacle was last seen
+    """
+
+    FREE = 0
+    OBSTACLE = 1
+
+    def __init__(self, width: int, height: int, freshness: float = None, clock: Callable[[], float] = time.monotonic):
+        """
+        :param width: number of cells along the x axis
+        :param height: number of cells along the y axis
+        :param freshness: seconds after which a recorded obstacle is no longer trusted (None: forever)
+        :param clock: function returning the current time in seconds
+        """
+        if width <= 0 or height <= 0:
+            raise CleaningRobotError()
+        self.width = width
+        self.height = height
+        self.freshness = freshness
+        self.clock = clock
+        self.cells = bytearray(width * height)
+        self.seen_at = array("d", bytes(8 * width * height))
+
+    def contains(self, x: int, y: int) -> bool:
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def mark_obstacle(self, x: int, y: int, now: float = None) -> None:
+        """
+        :param now: the current time on the caller's clock, e.g. the clock of the robot that saw the obstacle
+        (None: the map's clock)
+        """
+        if self.contains(x, y):
+            index = y * self.width + x
+            self.cells[index] = self.OBSTACLE
+            self.seen_at[index] = self.clock() if now is None else now
+
+    def clear_obstacle(self, x: int, y: int) -> None:
+        if self.contains(x, y):
+            self.cells[y * self.width + x] = self.FREE
+
+    def is_obstacle(self, x: int, y: int) -> bool:
+        """
+        Whether an obstacle was ever recorded in the cell, regardless of how long ago
+        """
+        return self.contains(x, y) and self.cells[y * self.width + x] == self.OBSTACLE
+
+    def is_known_obstacle(self, x: int, y: int, now: float = None) -> bool:
+        """
+        Whether the cell contains an obstacle recorded within the freshness window
+        :param now: the current time on the caller's clock (None: the map's clock)
+        """
+        if not self.is_obstacle(x, y):
+            return False
+        if self.freshness is None:
+            return True
+        if now is None:
+            now = self.clock()
+        return now - self.seen_at[y * self.width + x] <= self.freshness
+
+    def obstacles_in_region(self, x0: int, y0: int, x1: int, y1: int) -> list:
+        """
+        Obstacle cells in the rectangle going from (x0, y0) to (x1, y1), both included
+        """
+        x0, y0 = max(x0, 0), max(y0, 0)
+        x1, y1 = min(x1, self.width - 1), min(y1, self.height - 1)
+        obstacles = []
+        for y in range(y0, y1 + 1):
+            row = y * self.width
+            start = x0
+            while True:
+                ##bytearray.find scans the row in C instead of testing one cell at a time
+                index = self.cells.find(self.OBSTACLE, row + start, row + x1 + 1)
+                if index == -1:
+                    break
+                obstacles.append((index - row, y))
+                start = index - row + 1
+        return obstacles
+
+    def count_obstacles(self, x0: int = 0, y0: int = 0, x1: int = None, y1: int = None) -> int:
+        if x1 is None:
+            x1 = self.width - 1
+        if y1 is None:
+            y1 = self.height - 1
+        if (x0, y0, x1, y1) == (0, 0, self.width - 1, self.height - 1):
+            return self.cells.count(self.OBSTACLE)
+        return len(self.obstacles_in_region(x0, y0, x1, y1))
@@ -0,0 +1,132 @@
+from typing import Iterable
+
+from src.cleaning_robot import DX, DY, HEADING_CODES, HEADINGS, TURNS, CleaningRobot, CleaningRobotError
+
+try:
+    import numpy as np
+except ImportError:  # The planner still works without NumPy, only slower
+    np = None
+
+##Poses checked for obstacles at once by the NumPy preview after a blocked move, see _preview_numpy
+PREVIEW_WINDOW = 64
+
+
+##The heading and command encodings and their tables are those of the robot state model, see src.cleaning_robot:
+##headings are 0..3 (N, E, S, W), commands 0 (forward), 1 (left), 2 (right); TURNS gives the heading change of each command
+
+
+class RoutePreview:
+    """
+    Every intermediate pose of a route. Item i is the pose reached after the i-th command;
+    blocked[i] is True when the i-th command was a forward move stopped by an obstacle
+    """
+
+    def __init__(self, xs, ys, headings, blocked):
+        self.xs = xs
+        self.ys = ys
+        self.headings = headings
+        self.blocked = blocked
+
+    def __len__(self) -> int:
+        return len(self.xs)
+
+    def poses(self) -> list:
+        return [(int(x), int(y), HEADINGS[int(h)]) for x, y, h in zip(self.xs, self.ys, self.headings)]
+
+    def blocked_steps(self) -> list:
+        return [step for step, blocked in enumerate(self.blocked) if blocked]
+
+
+def preview_route(commands: Iterable[str], x: int = 0, y: int = 0, heading: str = CleaningRobot.N,
+                  obstacles: Iterable = ()) -> RoutePreview:
+    """
+    Compute the poses the robot goes through while executing a route, without moving it
+    :param commands: the route, e.g. "ffrfl"
+    :param x: starting x coordinate
+    :param y: starting y coordinate
+    :param heading: starting heading
+    :param obstacles: the (x, y) cells known to contain an obstacle
+    :return: a RoutePreview with one pose per command
+    """
+    if heading not in HEADINGS:
+        raise CleaningRobotError()
+    codes = CleaningRobot.encode_commands(commands)
+    obstacles = set((int(ox), int(oy)) for ox, oy in obstacles)
+    if np is None:
+        return _preview_python(codes, x, y, HEADING_CODES[heading], obstacles)
+    return _preview_numpy(codes, x, y, HEADING_CODES[heading], obstacles)
+
+
+def _preview_numpy(codes: bytes, x: int, y: int, heading: int, obstacles: set) -> RoutePreview:
+    codes = np.frombuffer(codes, dtype=np.int8)
+    turns = np.asarray(TURNS, dtype=np.int64)
+    dx_table = np.asarray(DX, dtype=np.int64)
+    dy_table = np.asarray(DY, dtype=np.int64)
+    ##Sorted once, so that every window looks its cells up with a binary search
+    obstacle_keys = np.sort(np.asarray([_cell_key(ox, oy) for ox, oy in obstacles], dtype=np.int64))
+
+    ##Obstacles never change the headings, so the headings and the unobstructed steps are computed once
+    headings = ((heading + np.cumsum(turns[codes])) % 4).astype(np.int8)
+    forward = codes == 0
+    steps_x = dx_table[headings] * forward
+    steps_y = dy_table[headings] * forward
+    reach_x = x + np.cumsum(steps_x)
+    reach_y = y + np.cumsum(steps_y)
+
+    n = len(codes)
+    xs = np.empty(n, dtype=np.int64)
+    ys = np.empty(n, dtype=np.int64)
+    blocked = np.zeros(n, dtype=bool)
+
+    ##A blocked move shifts every later pose back by its step. The poses are checked for obstacles window
+    ##by window, from the last hit on: a window without hits doubles the next one, a hit starts small again
+    shift_x = shift_y = 0
+    start = 0
+    window = PREVIEW_WINDOW
+    while start < n:
+        end = min(start + window, n)
+        segment_xs = reach_x[start:end] - shift_x
+        segment_ys = reach_y[start:end] - shift_y
+        hits = ()
+        if len(obstacle_keys) > 0:
+            keys = _cell_key(segment_xs, segment_ys)
+            found = obstacle_keys[np.minimum(np.searchsorted(obstacle_keys, keys), len(obstacle_keys) - 1)] == keys
+            hits = np.flatnonzero(forward[start:end] & found)
+        if len(hits) == 0:
+            xs[start:end] = segment_xs
+            ys[start:end] = segment_ys
+            start = end
+            window *= 2
+            continue
+
+        hit = start + int(hits[0])
+        xs[start:hit] = segment_xs[:hit - start]
+        ys[start:hit] = segment_ys[:hit - start]
+        shift_x += int(steps_x[hit])
+        shift_y += int(steps_y[hit])
+        xs[hit], ys[hit] = int(reach_x[hit]) - shift_x, int(reach_y[hit]) - shift_y
+        blocked[hit] = True
+        start = hit + 1
+        window = PREVIEW_WINDOW
+    return RoutePreview(xs, ys, headings, blocked)
+
+
+def _preview_python(codes: bytes, x: int, y: int, heading: int, obstacles: set) -> RoutePreview:
+    xs, ys, headings, blocked = [], [], [], []
+    for code in codes:
+        new_x, new_y, heading = CleaningRobot.next_pose(x, y, heading, code)
+        hit = False
+        if code == 0:
+            hit = (new_x, new_y) in obstacles
+            if not hit:
+                x, y = new_x, new_y
+        xs.append(x)
+        ys.append(y)
+        headings.append(heading)
+        blocked.append(hit)
+    return RoutePreview(xs, ys, headings, blocked)
+
+
+def _cell_key(x, y):
+    ##Packs a cell in a single int64 so that obstacle lookups become one vectorized np.isin
+    return x * (1 << 32) + y
@@ -0,0 +1,69 @@
+import itertools
+import time
+from collections import namedtuple
+from typing import Iterable, Iterator
+
+from src.cleaning_robot import CleaningRobot
+
+ChunkResult = namedtuple("ChunkResult", ["index", "commands", "results", "elapsed", "commands_per_second",
+                                         "total_commands", "pose"])
+
+
+def read_commands(source, read_size: int = 65536) -> Iterator[str]:
+    """
+    Yield the commands of a route one at a time, without loading it whole
+    :param source: the path of a route file, an open file (text or binary, e.g. a pipe or sys.stdin)
+    or an iterable of commands such as a generator; whitespace between commands is skipped
+    :param read_size: characters read from a file at once
+    """
+    if isinstance(source, str):
+        with open(source) as route_file:
+            yield from read_commands(route_file, read_size)
+        return
+    if hasattr(source, "read"):
+        while True:
+            data = source.read(read_size)
+            if not data:
+                return
+            if isinstance(data, bytes):
+                data = data.decode("ascii", errors="replace")
+            for command in data:
+                if not command.isspace():
+                    yield command
+        return
+    for command in source:
+        if not command.isspace():
+            yield command
+
+
+def run_route_stream(robot: CleaningRobot, source, chunk_size: int = 1000, battery_check_interval: int = 50,
+                     merge_forward: bool = False) -> Iterator[ChunkResult]:
+    """
+    Execute a route read lazily from a file, a pipe or a generator, chunk_size commands at a time through
+    execute_commands, so that a route of any length runs in constant memory.
+    The route stops after the chunk in which a command was refused because of low battery
+    :param battery_check_interval: see execute_commands; the IBS is also read at the start of every chunk
+    :param merge_forward: see execute_commands
+    :return: a generator of one ChunkResult per chunk, with the status of its commands and its throughput
+    """
+    commands = read_commands(source)
+    total = 0
+    for index in itertools.count():
+        chunk = list(itertools.islice(commands, chunk_size))
+        if not chunk:
+            return
+        start = time.perf_counter()
+        results = robot.execute_commands(chunk, battery_check_interval, merge_forward)
+        elapsed = time.perf_counter() - start
+        total += len(results)
+        yield ChunkResult(index, len(results), results, elapsed, len(results) / elapsed if elapsed > 0 else 0.0,
+                          total, (robot.pos_x, robot.pos_y, robot.heading))
+        if results and results[-1].startswith("!"):
+            return
+
+
+def generate_route(length: int, pattern: Iterable[str] = "ffrfflffr") -> Iterator[str]:
+    """
+    Yield a route of the given length repeating a pattern, e.g. for soak tests
+    """
+    return itertools.islice(itertools.cycle(pattern), length)
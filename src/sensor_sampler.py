@@ -0,0 +1,214 @@
+import threading
+import time
+from array import array
+from typing import Callable
+
+from src.hooks import remove_proxy
+
+
+class SampleRing:
+    """
+    Fixed-size ring of timestamped and tagged samples, preallocated and written by a single thread.
+    The writer fills slot head % capacity and only then increments head, so readers never
+    need a lock to get the latest sample
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.values = array("d", bytes(8 * capacity))
+        self.times = array("d", bytes(8 * capacity))
+        self.tags = array("Q", bytes(8 * capacity))
+        self.head = 0  # Number of samples written so far
+
+    def append(self, value: float, sampled_at: float, tag: int = 0) -> None:
+        index = self.head % self.capacity
+        self.values[index] = value
+        self.times[index] = sampled_at
+        self.tags[index] = tag
+        self.head += 1
+
+    def latest(self) -> tuple:
+        """
+        :return: the last sample as (value, time, tag), None if there is none yet
+        """
+        head = self.head
+        if head == 0:
+            return None
+        index = (head - 1) % self.capacity
+        return self.values[index], self.times[index], self.tags[index]
+
+
+class _SampledIBS:
+    ##Returns the last battery sample while it is fresh enough, otherwise reads the IBS.
+    ##on_read (taken over from the BatteryMonitor) is only called when the IBS is actually read
+
+    def __init__(self, ibs, sampler: "SensorSampler", on_read: Callable[[], None] = None):
+        self.ibs = ibs
+        self.sampler = sampler
+        self.on_read = on_read
+
+    def __getattr__(self, name):
+        return getattr(self.ibs, name)
+
+    def get_charge_left(self):
+        charge = self.sampler.latest_battery()
+        if charge is None:
+            if self.on_read is not None:
+                self.on_read()
+            with self.sampler.bus_lock:
+                return self.ibs.get_charge_left()
+        return charge
+
+
+class SensorSampler:
+    """
+    Background thread polling the infrared sensor and the IBS at their own rates into SampleRings,
+    so that reading a sensor costs the caller a buffer lookup instead of a GPIO or I2C access.
+    A sample older than its staleness limit is not used: the caller then reads the sensor itself.
+    Infrared samples are also stale once the robot has moved or turned since they were taken, as the
+    sensor was then looking at another cell.
+    With a simulated clock (see call_at), the samples are taken by events of the clock instead of a thread,
+    at the simulated rates
+    """
+
+    def __init__(self, gpio, ibs, infrared_pin: int, infrared_rate: float = 100.0, battery_rate: float = 1.0,
+                 max_infrared_age: float = 0.05, max_battery_age: float = 5.0, capacity: int = 256,
+                 clock: Callable[[], float] = time.monotonic, motions: Callable[[], int] = None,
+                 call_at: Callable[[float, Callable[[], None]], None] = None):
+        """
+        :param gpio: the GPIO the infrared sensor is connected to
+        :param ibs: the Intelligent Battery Sensor
+        :param infrared_pin: the pin of the infrared sensor
+        :param infrared_rate: infrared samples per second
+        :param battery_rate: IBS samples per second
+        :param max_infrared_age: seconds after which an infrared sample is stale
+        :param max_battery_age: seconds after which an IBS sample is stale
+        :param capacity: samples kept for each sensor
+        :param clock: function returning the current time in seconds
+        :param motions: function returning how many times the robot moved or turned (see CleaningRobot.motions)
+        :param call_at: function scheduling a callback at a time of clock, e.g. VirtualClock.call_at;
+        when given, no thread is started and the samples are taken by the scheduled callbacks
+        """
+        self.gpio = gpio
+        self.ibs = ibs
+        self.infrared_pin = infrared_pin
+        self.infrared_period = 1.0 / infrared_rate
+        self.battery_period = 1.0 / battery_rate
+        self.max_infrared_age = max_infrared_age
+        self.max_battery_age = max_battery_age
+        self.clock = clock
+        self.motions = motions if motions is not None else lambda: 0
+        self.call_at = call_at
+        ##The IBS is also read by the robot when the last sample is stale: one I2C transfer at a time
+        self.bus_lock = threading.Lock()
+        self.infrared = SampleRing(capacity)
+        self.battery = SampleRing(capacity)
+        self.stale_reads = {"infrared": 0, "battery": 0}
+        self.started_at = None
+        self.sampled_ibs = None
+        self.stopping = threading.Event()
+        self.thread = None
+        self.scheduled = False
+        ##Incremented by stop(), so that the callbacks scheduled before do not schedule the next samples
+        self.generation = 0
+
+    def start(self) -> None:
+        if self.thread is not None or self.scheduled:
+            return
+        self.stopping.clear()
+        self.started_at = self.clock()
+        if self.call_at is not None:
+            self.scheduled = True
+            self._schedule(self.sample_infrared, self.infrared_period, self.generation)()
+            self._schedule(self.sample_battery, self.battery_period, self.generation)()
+            return
+        self.thread = threading.Thread(target=self._run, name="sensor-sampler", daemon=True)
+        self.thread.start()
+
+    def stop(self) -> None:
+        if self.scheduled:
+            self.scheduled = False
+            self.generation += 1
+        if self.thread is None:
+            return
+        self.stopping.set()
+        self.thread.join()
+        self.thread = None
+
+    def _schedule(self, sample: Callable[[], None], period: float, generation: int) -> Callable[[], None]:
+        def take_sample():
+            if generation == self.generation:
+                sample()
+                self.call_at(self.clock() + period, take_sample)
+        return take_sample
+
+    def _run(self) -> None:
+        next_infrared = next_battery = self.clock()
+        while not self.stopping.is_set():
+            now = self.clock()
+            if now >= next_infrared:
+                self.sample_infrared()
+                next_infrared = max(next_infrared + self.infrared_period, now)
+            if now >= next_battery:
+                self.sample_battery()
+                next_battery = max(next_battery + self.battery_period, now)
+            self.stopping.wait(max(min(next_infrared, next_battery) - self.clock(), 0))
+
+    def sample_infrared(self) -> None:
+        ##The motion count is taken first: a sample read while the robot finishes a move gets the old count
+        motions = self.motions()
+        value = self.gpio.input(self.infrared_pin)
+        self.infrared.append(1 if value else 0, self.clock(), motions)
+
+    def sample_battery(self) -> None:
+        with self.bus_lock:
+            charge = self.ibs.get_charge_left()
+        self.battery.append(charge, self.clock())
+
+    def latest_infrared(self):
+        """
+        :return: whether the last infrared sample saw an obstacle, None if there is no fresh sample
+        """
+        sample = self._fresh(self.infrared, self.max_infrared_age, "infrared", self.motions())
+        return None if sample is None else bool(sample)
+
+    def latest_battery(self):
+        """
+        :return: the last charge sampled, None if there is no fresh sample
+        """
+        sample = self._fresh(self.battery, self.max_battery_age, "battery")
+        return None if sample is None else int(sample)
+
+    def _fresh(self, ring: SampleRing, max_age: float, name: str, tag: int = 0):
+        sample = ring.latest()
+        if sample is None or self.clock() - sample[1] > max_age or sample[2] != tag:
+            self.stale_reads[name] += 1
+            return None
+        return sample[0]
+
+    def stats(self) -> dict:
+        """
+        :return: the samples taken and the measured sample rate of each sensor, and the reads that found
+        no fresh sample
+        """
+        elapsed = self.clock() - self.started_at if self.started_at is not None else 0.0
+        return {"infrared_samples": self.infrared.head,
+                "battery_samples": self.battery.head,
+                "infrared_rate": self.infrared.head / elapsed if elapsed > 0 else 0.0,
+                "battery_rate": self.battery.head / elapsed if elapsed > 0 else 0.0,
+                "stale_infrared_reads": self.stale_reads["infrared"],
+                "stale_battery_reads": self.stale_reads["battery"]}
+
+    def attach(self, robot) -> "SensorSampler":
+        """
+        Make the charge readings of a robot use the battery samples; see CleaningRobot.enable_sensor_sampler
+        """
+        self.sampled_ibs = _SampledIBS(robot.battery.ibs, self, robot.battery.on_read)
+        robot.battery.ibs = self.sampled_ibs
+        robot.battery.on_read = None
+        return self
+
+    def detach(self, robot) -> None:
+        remove_proxy(robot.battery, "ibs", self.sampled_ibs)
+        if self.sampled_ibs.on_read is not None:
+            robot.battery.on_read = self.sampled_ibs.on_read
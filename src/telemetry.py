@@ -0,0 +1,87 @@
+import struct
+from collections import namedtuple
+
+from src.cleaning_robot import HEADING_CODES, HEADINGS, CleaningRobot, CleaningRobotError
+
+##Fixed-size little-endian record: x (int32), y (int32), heading (uint8), flags (uint8), battery (uint8)
+RECORD = struct.Struct("<iiBBB")
+
+UNKNOWN = 255  # Heading or battery not known yet
+
+BLOCKED = 1
+RECHARGE_LED_ON = 2
+CLEANING_SYSTEM_ON = 4
+BUZZER_ON = 8
+
+StatusRecord = namedtuple("StatusRecord", ["x", "y", "heading", "blocked", "recharge_led_on",
+                                           "cleaning_system_on", "buzzer_on", "battery"])
+
+
+def _fields(robot: CleaningRobot) -> tuple:
+    heading = HEADING_CODES.get(robot.heading, UNKNOWN)
+    flags = ((BLOCKED if robot.last_command_blocked else 0) | (RECHARGE_LED_ON if robot.recharge_led_on else 0)
+             | (CLEANING_SYSTEM_ON if robot.cleaning_system_on else 0) | (BUZZER_ON if robot.buzzer_on else 0))
+    battery = robot.battery.last_reading
+    battery = UNKNOWN if battery is None else min(max(int(battery), 0), 100)
+    return robot.pos_x or 0, robot.pos_y or 0, heading, flags, battery
+
+
+def pack_status(robot: CleaningRobot) -> bytes:
+    return RECORD.pack(*_fields(robot))
+
+
+def pack_status_into(buffer, offset: int, robot: CleaningRobot) -> None:
+    RECORD.pack_into(buffer, offset, *_fields(robot))
+
+
+def unpack_status(data, offset: int = 0) -> StatusRecord:
+    return _record(RECORD.unpack_from(data, offset))
+
+
+def _record(fields: tuple) -> StatusRecord:
+    x, y, heading, flags, battery = fields
+    return StatusRecord(x, y, HEADINGS[heading] if heading != UNKNOWN else None, bool(flags & BLOCKED),
+                        bool(flags & RECHARGE_LED_ON), bool(flags & CLEANING_SYSTEM_ON), bool(flags & BUZZER_ON),
+                        battery if battery != UNKNOWN else None)
+
+
+def format_status(record: StatusRecord, with_obstacle: bool = False) -> str:
+    """
+    The status string of CleaningRobot.robot_status, derived from a record.
+    With with_obstacle, a blocked record is followed by the cell of the obstacle, as execute_command does
+    """
+    status = "(" + str(record.x) + "," + str(record.y) + "," + str(record.heading) + ")"
+    if with_obstacle and record.blocked and record.heading is not None:
+        x, y, _ = CleaningRobot.next_pose(record.x, record.y, HEADING_CODES[record.heading], 0)
+        status += "(" + str(x) + "," + str(y) + ")"
+    return status
+
+
+class TelemetryBuffer:
+    """
+    Preallocated bytearray holding up to capacity records, one after the other,
+    which can be sent as is through view() without copying it
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.data = bytearray(capacity * RECORD.size)
+        self.count = 0
+
+    def __len__(self) -> int:
+        return self.count
+
+    def append(self, robot: CleaningRobot) -> None:
+        if self.count == self.capacity:
+            raise CleaningRobotError()
+        pack_status_into(self.data, self.count * RECORD.size, robot)
+        self.count += 1
+
+    def view(self) -> memoryview:
+        return memoryview(self.data)[:self.count * RECORD.size]
+
+    def records(self) -> list:
+        return [_record(fields) for fields in RECORD.iter_unpack(self.view())]
+
+    def clear(self) -> None:
+        self.count = 0
@@ -0,0 +1,76 @@
+import asyncio
+from unittest import TestCase
+from unittest.mock import Mock, patch, call
+
+from mock import GPIO
+from mock.ibs import IBS
+from src.async_cleaning_robot import AsyncCleaningRobot
+
+
+class TestAsyncCleaningRobot(TestCase):
+
+    @patch.object(IBS, "get_charge_left")
+    @patch.object(GPIO, "input")
+    def test_execute_route(self, mock_infrared: Mock, mock_battery: Mock):
+        mock_battery.return_value = 11
+        mock_infrared.return_value = False
+        robot = AsyncCleaningRobot()
+        robot.initialize_robot()
+        result = asyncio.run(robot.execute_route("frf"))
+        self.assertEqual(["(0,1,N)", "(0,1,E)", "(1,1,E)"], result)
+
+    @patch.object(IBS, "get_charge_left")
+    @patch.object(GPIO, "input")
+    def test_obstacle_during_move_aborts_it(self, mock_infrared: Mock, mock_battery: Mock):
+        mock_battery.return_value = 11
+        mock_infrared.side_effect = [False, False, True]
+        robot = AsyncCleaningRobot()
+        robot.initialize_robot()
+        robot.motor_time = 5
+        robot.POLL_INTERVAL = 0.001
+        result = asyncio.run(robot.execute_command(robot.FORWARD))
+        self.assertEqual("(0,0,N)(0,1)", result)
+        self.assertTrue(robot.block_way)
+
+    @patch.object(IBS, "get_charge_left")
+    @patch.object(GPIO, "output")
+    @patch.object(GPIO, "input")
+    def test_cancel_route_stops_motor(self, mock_infrared: Mock, mock_pins: Mock, mock_battery: Mock):
+        mock_battery.return_value = 11
+        mock_infrared.return_value = False
+        robot = AsyncCleaningRobot()
+        robot.initialize_robot()
+        robot.motor_time = 5
+
+        async def cancel_route():
+            route = asyncio.ensure_future(robot.execute_route("ff"))
+            await asyncio.sleep(0.05)
+            route.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await route
+
+        asyncio.run(cancel_route())
+        self.assertEqual("(0,0,N)", robot.robot_status())
+        self.assertEqual(call(robot.STBY, GPIO.LOW), mock_pins.call_args)
+
+    @patch.object(IBS, "get_charge_left")
+    def test_low_battery(self, mock_battery: Mock):
+        mock_battery.return_value = 10
+        robot = AsyncCleaningRobot()
+        robot.initialize_robot()
+        self.assertEqual(["!(0,0,N)"], asyncio.run(robot.execute_route("ff")))
+        self.assertTrue(robot.recharge_led_on)
+
+    @patch.object(IBS, "get_charge_left")
+    @patch.object(GPIO, "input")
+    def test_sensor_error_during_move_is_raised(self, mock_infrared: Mock, mock_battery: Mock):
+        mock_battery.side_effect = [11, OSError("I2C read failed")]
+        mock_infrared.return_value = False
+        robot = AsyncCleaningRobot()
+        robot.initialize_robot()
+        robot.motor_time = 5
+        robot.POLL_INTERVAL = 0.001
+        with self.assertRaises(OSError):
+            asyncio.run(robot.execute_command(robot.FORWARD))
+        self.assertEqual("(0,0,N)", robot.robot_status())
+        self.assertFalse(robot.block_way)
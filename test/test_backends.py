@@ -0,0 +1,69 @@
+from unittest import TestCase
+from unittest.mock import Mock, patch
+
+from mock import GPIO
+from src.backends import Backend, SimulatedBackend, SimulatedGPIO, SimulatedIBS
+from src.cleaning_robot import CleaningRobot
+
+
+class TestBackends(TestCase):
+
+    def test_simulated_gpio_output_list(self):
+        gpio = SimulatedGPIO()
+        gpio.output([12, 13], [GPIO.HIGH, GPIO.LOW])
+        self.assertEqual((1, 0), (gpio.pins[12], gpio.pins[13]))
+
+    def test_simulated_gpio_scripted_input(self):
+        gpio = SimulatedGPIO()
+        gpio.script_input(15, [False, True])
+        self.assertEqual([False, True, True], [gpio.input(15), gpio.input(15), gpio.input(15)])
+
+    def test_simulated_ibs_drains_on_motor_activation(self):
+        gpio = SimulatedGPIO()
+        ibs = SimulatedIBS(50, gpio, {CleaningRobot.PWMA: 2})
+        gpio.output(CleaningRobot.PWMA, GPIO.HIGH)
+        gpio.output(CleaningRobot.PWMA, GPIO.LOW)
+        gpio.output(CleaningRobot.PWMA, GPIO.HIGH)
+        self.assertEqual(46, ibs.get_charge_left())
+
+    def test_simulated_pwm_counts_real_rising_edges(self):
+        gpio = SimulatedGPIO()
+        pwm = gpio.PWM(CleaningRobot.PWMA, 1000)
+        pwm.start(0)
+        for dutycycle in [50, 100, 100, 80, 100, 0, 100]:
+            pwm.ChangeDutyCycle(dutycycle)
+        pwm.stop()
+        self.assertEqual(2, gpio.rising_edges[CleaningRobot.PWMA])
+        self.assertEqual(0, gpio.pins[CleaningRobot.PWMA])
+
+    def test_simulated_ibs_drains_per_cell_kept_running(self):
+        backend = SimulatedBackend(charge=50, discharge={CleaningRobot.PWMA: 2})
+        backend.gpio.output(CleaningRobot.PWMA, GPIO.HIGH)
+        backend.motor_kept_running(CleaningRobot.PWMA)
+        backend.motor_kept_running(CleaningRobot.PWMA)
+        self.assertEqual(44, backend.ibs.get_charge_left())
+
+    def test_simulated_ibs_scripted_readings(self):
+        ibs = SimulatedIBS()
+        ibs.script([30, 20])
+        self.assertEqual([30, 20, 20], [ibs.get_charge_left(), ibs.get_charge_left(), ibs.get_charge_left()])
+
+    @patch.object(GPIO, "output")
+    def test_robot_with_simulated_backend(self, mock_pins: Mock):
+        backend = SimulatedBackend(charge=50)
+        backend.gpio.script_input(CleaningRobot.INFRARED_PIN, [False, True])
+        robot = CleaningRobot(backend)
+        robot.initialize_robot()
+        self.assertEqual(["(0,1,N)", "(0,1,N)(0,2)"], robot.execute_commands("ff"))
+        self.assertEqual(0, backend.gpio.pins[CleaningRobot.PWMA])
+        self.assertEqual(1, backend.gpio.rising_edges[CleaningRobot.PWMA])
+        mock_pins.assert_not_called()
+
+    def test_robot_with_custom_backend(self):
+        gpio = Mock()
+        ibs = Mock()
+        ibs.get_charge_left.return_value = 11
+        robot = CleaningRobot(Backend(gpio, ibs))
+        robot.manage_cleaning_system()
+        gpio.output.assert_called_with(robot.CLEANING_SYSTEM_PIN, GPIO.HIGH)
+        self.assertFalse(robot.realtime)
@@ -0,0 +1,77 @@
+from unittest import TestCase
+from unittest.mock import Mock, patch
+
+from mock.ibs import IBS
+from src.backends import SimulatedBackend
+from src.battery_monitor import BatteryMonitor
+from src.cleaning_robot import CleaningRobot
+
+
+class TestBatteryMonitor(TestCase):
+
+    def test_no_ttl_reads_every_time(self):
+        ibs = Mock()
+        ibs.get_charge_left.side_effect = [50, 40]
+        battery = BatteryMonitor(ibs)
+        self.assertEqual(50, battery.charge_left())
+        self.assertEqual(40, battery.charge_left())
+
+    def test_reading_cached_within_ttl(self):
+        ibs = Mock()
+        ibs.get_charge_left.side_effect = [50, 40]
+        now = Mock(return_value=0.0)
+        battery = BatteryMonitor(ibs, ttl=5, clock=now)
+        battery.charge_left()
+        now.return_value = 4.0
+        self.assertEqual(50, battery.charge_left())
+        now.return_value = 5.0
+        self.assertEqual(40, battery.charge_left())
+        self.assertEqual(2, battery.reads)
+
+    def test_discharge_model_extrapolates_between_readings(self):
+        ibs = Mock()
+        ibs.get_charge_left.return_value = 50
+        battery = BatteryMonitor(ibs, ttl=60, forward_discharge=0.5, rotation_discharge=0.25, clock=Mock(return_value=0.0))
+        battery.charge_left()
+        battery.record_move(True)
+        battery.record_move(True)
+        battery.record_move(False)
+        self.assertEqual(48.75, battery.charge_left())
+        ibs.get_charge_left.assert_called_once()
+
+    def test_smoothing(self):
+        ibs = Mock()
+        ibs.get_charge_left.side_effect = [50, 40]
+        battery = BatteryMonitor(ibs, smoothing=0.5)
+        battery.charge_left()
+        self.assertEqual(45, battery.charge_left())
+
+    def test_robot_reuses_readings_within_ttl(self):
+        backend = SimulatedBackend(charge=50)
+        robot = CleaningRobot(backend, battery_ttl=10, forward_discharge=0.5, rotation_discharge=0.25)
+        robot.initialize_robot()
+        for command in "ffrfffffrfff":
+            robot.execute_command(command)
+        ##12 commands of MOTOR_TIME seconds each: one reading every 10 seconds
+        self.assertEqual(2, backend.ibs.reads)
+        ##The last two moves were made after the second reading
+        self.assertEqual(50 - 2 * 0.5, robot.battery.estimated_charge())
+
+    @patch.object(IBS, "get_charge_left")
+    def test_low_battery_command_reads_ibs_once(self, mock_battery: Mock):
+        mock_battery.return_value = 9
+        robot = CleaningRobot()
+        robot.initialize_robot()
+        self.assertEqual("!(0,0,N)", robot.execute_command(robot.FORWARD))
+        mock_battery.assert_called_once()
+
+    @patch.object(IBS, "get_charge_left")
+    @patch.object(CleaningRobot, "activate_wheel_motor")
+    def test_execute_commands_stops_when_estimate_reaches_threshold(self, mock_wheel: Mock, mock_battery: Mock):
+        mock_battery.return_value = 12
+        robot = CleaningRobot()
+        robot.initialize_robot()
+        robot.battery.forward_discharge = 1
+        result = robot.execute_commands("ffff")
+        self.assertEqual(["(0,1,N)", "(0,2,N)", "!(0,2,N)"], result)
+        mock_battery.assert_called_once()
@@ -0,0 +1,24 @@
+from unittest import TestCase
+
+from benchmarks.bench_cleaning_robot import compare, create_robot
+
+
+class TestBenchmarks(TestCase):
+
+    def test_compare_flags_regression(self):
+        lines, regressions = compare({"a": 70.0, "b": 90.0, "c": 10.0}, {"a": 100.0, "b": 100.0}, 0.2)
+        self.assertEqual(["a"], regressions)
+        self.assertEqual(3, len(lines))
+        self.assertTrue(lines[2].endswith("(new)"))
+
+    def test_create_robot_with_obstacles(self):
+        for backend_name in ["mock", "simulated"]:
+            robot = create_robot(backend_name, 1.0)
+            self.assertEqual("(0,0,N)(0,1)", robot.execute_command(robot.FORWARD))
+
+    def test_compare_relative_to_calibration(self):
+        ##The whole machine runs at half the speed of the baseline one: no regression
+        lines, regressions = compare({"calibration": 50.0, "a": 40.0, "b": 30.0},
+                                     {"calibration": 100.0, "a": 80.0, "b": 80.0}, 0.2)
+        self.assertEqual(["b"], regressions)
+        self.assertTrue(lines[0].startswith("calibration"))
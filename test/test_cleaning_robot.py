@@ -4,6 +4,7 @@ from unittest.mock import Mock, patch, call
 from mock import GPIO
 from mock.ibs import IBS
 from src.cleaning_robot import CleaningRobot, CleaningRobotError
+from src.room_map import RoomMap
 
 
 class TestCleaningRobot(TestCase):
@@ -219,4 +220,99 @@ class TestCleaningRobot(TestCase):
         commands=[robot.FORWARD, robot.LEFT, robot.LEFT, robot.LEFT]
         robot.make_buzzer_buzz(robot.heading, commands)
         mock_buzzer.assert_called_with(robot.BUZZER_PIN, True)
-        self.assertTrue(robot.buzzer_on)
\ No newline at end of file
+        self.assertTrue(robot.buzzer_on)
+
+    @patch.object(IBS, "get_charge_left")
+    @patch.object(CleaningRobot, "activate_rotation_motor")
+    @patch.object(CleaningRobot, "activate_wheel_motor")
+    def test_execute_commands_route(self, mock_wheel: Mock, mock_rotation: Mock, mock_battery: Mock):
+        mock_battery.return_value = 11
+        robot = CleaningRobot()
+        robot.initialize_robot()
+        result = robot.execute_commands("frf")
+        self.assertEqual(["(0,1,N)", "(0,1,E)", "(1,1,E)"], result)
+
+    @patch.object(IBS, "get_charge_left")
+    @patch.object(CleaningRobot, "activate_wheel_motor")
+    def test_execute_commands_reads_battery_once_per_interval(self, mock_wheel: Mock, mock_battery: Mock):
+        mock_battery.return_value = 11
+        robot = CleaningRobot()
+        robot.initialize_robot()
+        robot.execute_commands([robot.FORWARD] * 10, battery_check_interval=4)
+        self.assertEqual(3, mock_battery.call_count)
+
+    @patch.object(GPIO, "output")
+    @patch.object(IBS, "get_charge_left")
+    def test_execute_commands_stops_on_low_battery(self, mock_battery: Mock, mock_pins: Mock):
+        mock_battery.return_value = 10
+        robot = CleaningRobot()
+        robot.initialize_robot()
+        result = robot.execute_commands("fff")
+        self.assertEqual(["!(0,0,N)"], result)
+        self.assertTrue(robot.recharge_led_on)
+
+    @patch.object(IBS, "get_charge_left")
+    def test_execute_commands_invalid_command(self, mock_battery: Mock):
+        mock_battery.return_value = 11
+        robot = CleaningRobot()
+        robot.initialize_robot()
+        self.assertRaises(CleaningRobotError, robot.execute_commands, "fxf")
+        mock_battery.assert_not_called()
+
+    @patch.object(GPIO, "output")
+    @patch.object(GPIO, "input")
+    @patch.object(CleaningRobot, "activate_wheel_motor")
+    def test_check_stuck_corner_buzzerOn_without_moving(self, mock_wheel: Mock, mock_infrared: Mock, mock_buzzer: Mock):
+        mock_infrared.return_value = False
+        robot = CleaningRobot()
+        robot.initialize_robot()
+        robot.room_map = RoomMap(3, 3)
+        robot.room_map.mark_obstacle(0, 1)
+        robot.room_map.mark_obstacle(1, 0)
+        self.assertTrue(robot.check_stuck())
+        mock_buzzer.assert_called_with(robot.BUZZER_PIN, True)
+        mock_wheel.assert_not_called()
+        self.assertEqual("(0,0,N)", robot.robot_status())
+
+    @patch.object(GPIO, "output")
+    @patch.object(GPIO, "input")
+    def test_check_stuck_front_blocked_by_infrared(self, mock_infrared: Mock, mock_buzzer: Mock):
+        mock_infrared.return_value = True
+        robot = CleaningRobot()
+        robot.initialize_robot()
+        robot.pos_x, robot.pos_y = 1, 1
+        robot.room_map = RoomMap(3, 3)
+        robot.room_map.mark_obstacle(0, 1)
+        robot.room_map.mark_obstacle(2, 1)
+        self.assertEqual({robot.N: True, robot.E: True, robot.S: False, robot.W: True}, robot.probe_neighbours())
+        self.assertFalse(robot.check_stuck())
+        self.assertFalse(robot.buzzer_on)
+
+    def test_calculate_new_heading_right_from_west(self):
+        robot = CleaningRobot()
+        self.assertEqual(robot.N, robot.calculate_new_heading(robot.W, robot.RIGHT))
+
+    def test_calculate_new_heading_left_from_north(self):
+        robot = CleaningRobot()
+        self.assertEqual(robot.W, robot.calculate_new_heading(robot.N, robot.LEFT))
+
+    def test_encode_commands(self):
+        robot = CleaningRobot()
+        self.assertEqual(bytes([0, 1, 2]), robot.encode_commands("flr"))
+        self.assertRaises(CleaningRobotError, robot.encode_commands, "fx")
+
+    def test_next_pose(self):
+        robot = CleaningRobot()
+        self.assertEqual((3, 2, 1), robot.next_pose(2, 2, 1, 0))
+        self.assertEqual((2, 2, 0), robot.next_pose(2, 2, 1, 1))
+
+    def test_follow_commands_matches_execute_commands(self):
+        robot = CleaningRobot()
+        robot.initialize_robot()
+        route = "ffrfflfrrfl"
+        expected = robot.follow_commands(route)
+        self.assertEqual(expected, robot.follow_commands(robot.encode_commands(route)))
+        with patch.object(IBS, "get_charge_left", return_value=50), patch.object(GPIO, "input", return_value=False):
+            robot.execute_commands(route)
+        self.assertEqual(expected, (robot.pos_x, robot.pos_y, robot.heading))
+        self.assertEqual((0, 0, robot.N), robot.follow_commands("ff", 0, -2, robot.N))
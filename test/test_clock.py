@@ -0,0 +1,134 @@
+import asyncio
+import threading
+import time
+from unittest import TestCase
+from unittest.mock import patch
+
+from src.async_cleaning_robot import AsyncCleaningRobot
+from src.backends import Backend, SimulatedBackend, SimulatedGPIO, SimulatedIBS
+from src.cleaning_robot import CleaningRobot
+from src.clock import SystemClock, VirtualClock
+from src.coverage_map import CoverageMap
+from src.fleet import FleetJob, simulate_robot
+from src.room_map import RoomMap
+
+
+class TestVirtualClock(TestCase):
+
+    def test_sleep_advances_time(self):
+        clock = VirtualClock(start=5.0)
+        clock.sleep(2.5, "wheel_motor")
+        clock.sleep(1.5)
+        self.assertEqual(9.0, clock.now())
+        self.assertEqual(4.0, clock.elapsed())
+        self.assertEqual({"wheel_motor": 2.5}, clock.busy)
+        self.assertEqual(0.625, clock.duty_cycle("wheel_motor"))
+
+    def test_events_run_in_order(self):
+        clock = VirtualClock()
+        calls = []
+        clock.call_at(2.0, lambda: calls.append(("b", clock.now())))
+        clock.call_later(1.0, lambda: calls.append(("a", clock.now())))
+        clock.call_at(5.0, lambda: calls.append(("c", clock.now())))
+        clock.sleep(3.0)
+        self.assertEqual([("a", 1.0), ("b", 2.0)], calls)
+        self.assertEqual(3.0, clock.now())
+
+    def test_wait_stops_at_event(self):
+        clock = VirtualClock()
+        event = threading.Event()
+        clock.call_at(0.4, event.set)
+        self.assertTrue(clock.wait(event, 1.0, "wheel_motor"))
+        self.assertEqual(0.4, clock.now())
+        self.assertEqual(0.4, clock.busy["wheel_motor"])
+        event.clear()
+        self.assertFalse(clock.wait(event, 1.0))
+        self.assertEqual(1.4, clock.now())
+
+    def test_device_access_latency(self):
+        clock = VirtualClock(latencies={"ibs": 0.01})
+        clock.device_access("ibs")
+        clock.device_access("infrared")
+        clock.device_access("unknown")
+        self.assertAlmostEqual(0.01 + VirtualClock.LATENCIES["infrared"], clock.now())
+
+
+class TestRobotClock(TestCase):
+
+    def test_default_clock(self):
+        self.assertIsInstance(CleaningRobot(SimulatedBackend()).clock, VirtualClock)
+        gpio = SimulatedGPIO()
+        self.assertIsInstance(CleaningRobot(Backend(gpio, SimulatedIBS(), realtime=True)).clock, SystemClock)
+
+    def test_mission_projected_duration(self):
+        clock = VirtualClock(latencies={"infrared": 0.0, "ibs": 0.0})
+        robot = CleaningRobot(SimulatedBackend(), clock)
+        robot.initialize_robot()
+        with patch("time.sleep") as sleep:
+            robot.execute_commands("ffrfl" * 1000)
+        sleep.assert_not_called()
+        report = clock.report()
+        self.assertEqual(5000 * CleaningRobot.MOTOR_TIME, report["duration"])
+        self.assertEqual(1.0, report["motor_duty_cycle"])
+        self.assertEqual(0.6, report["wheel_motor_duty_cycle"])
+
+    def test_sensor_and_i2c_latencies(self):
+        clock = VirtualClock(latencies={"infrared": 0.1, "ibs": 0.2})
+        robot = CleaningRobot(SimulatedBackend(), clock)
+        robot.initialize_robot()
+        robot.execute_command(robot.FORWARD)
+        self.assertAlmostEqual(CleaningRobot.MOTOR_TIME + 0.3, clock.now())
+        self.assertAlmostEqual(CleaningRobot.MOTOR_TIME / (CleaningRobot.MOTOR_TIME + 0.3), clock.duty_cycle("wheel_motor"))
+
+    def test_obstacle_interrupt_in_virtual_time(self):
+        backend = SimulatedBackend()
+        clock = VirtualClock()
+        robot = CleaningRobot(backend, clock)
+        robot.initialize_robot()
+        robot.enable_obstacle_interrupts()
+        clock.call_at(0.3, lambda: backend.gpio.set_input(robot.INFRARED_PIN, True))
+        self.assertEqual("(0,0,N)(0,1)", robot.execute_command(robot.FORWARD))
+        self.assertEqual(0.3, clock.now())
+        self.assertEqual([(0.3, True)], list(robot.edge_timestamps))
+
+    def test_fleet_reports_projected_duration(self):
+        job = FleetJob("ffrff", 5, 5, [], (0, 0, "N"), 100)
+        report = simulate_robot(job)
+        self.assertGreaterEqual(report["projected_duration"], 5 * CleaningRobot.MOTOR_TIME)
+        self.assertGreater(report["motor_duty_cycle"], 0.9)
+
+    def test_maps_follow_robot_clock(self):
+        clock = VirtualClock(start=1000.0, latencies={"infrared": 0.0, "ibs": 0.0})
+        robot = CleaningRobot(SimulatedBackend(), clock)
+        robot.initialize_robot()
+        room_map = RoomMap(3, 3, freshness=5)
+        robot.room_map = room_map
+        robot.coverage_map = CoverageMap(3, 3)
+        robot.gpio.script_input(robot.INFRARED_PIN, [False, True])
+        robot.execute_commands("ff")
+        self.assertEqual(1000.0 + CleaningRobot.MOTOR_TIME, robot.coverage_map.last_cleaned(0, 1))
+        self.assertEqual(1000.0 + CleaningRobot.MOTOR_TIME, room_map.seen_at[2 * 3])
+        self.assertEqual(["(0,1,N)(0,2)"], robot.execute_commands("f"))
+        clock.sleep(10)
+        robot.gpio.set_input(robot.INFRARED_PIN, False)
+        self.assertEqual(["(0,2,N)"], robot.execute_commands("f"))
+
+    def test_shared_map_keeps_its_clock(self):
+        room_map = RoomMap(3, 3, freshness=5)
+        robots = [CleaningRobot(SimulatedBackend(), VirtualClock(start=start)) for start in [100.0, 5000.0]]
+        for robot in robots:
+            robot.room_map = room_map
+        self.assertIs(time.monotonic, room_map.clock)
+        robots[1].initialize_robot()
+        robots[1].gpio.set_input(robots[1].INFRARED_PIN, True)
+        robots[1].execute_command(robots[1].FORWARD)
+        self.assertGreaterEqual(room_map.seen_at[3], 5000.0)
+
+    def test_async_robot_advances_clock(self):
+        clock = VirtualClock(latencies={"infrared": 0.0, "ibs": 0.0})
+        robot = AsyncCleaningRobot(SimulatedBackend(), clock)
+        robot.initialize_robot()
+        self.assertEqual(["(0,1,N)", "(0,1,E)"], asyncio.run(robot.execute_route("fr")))
+        self.assertEqual(2 * CleaningRobot.MOTOR_TIME, clock.now())
+        self.assertEqual({"wheel_motor": CleaningRobot.MOTOR_TIME, "rotation_motor": CleaningRobot.MOTOR_TIME},
+                         clock.busy)
@@ -0,0 +1,104 @@
+import threading
+from unittest import TestCase
+
+from src.backends import SimulatedBackend
+from src.cleaning_robot import CleaningRobot, CleaningRobotError
+from src.coordinator import Coordinator
+from src.room_map import RoomMap
+
+
+class TestCoordinator(TestCase):
+
+    def add_robot(self, coordinator: Coordinator, robot_id, x: int, y: int, heading: str,
+                  obstacles: set = frozenset()) -> CleaningRobot:
+        backend = SimulatedBackend()
+        robot = CleaningRobot(backend)
+        robot.pos_x, robot.pos_y, robot.heading = x, y, heading
+
+        def infrared():
+            target = robot.neighbour_cell(robot.pos_x, robot.pos_y, robot.heading)
+            return target in obstacles or any((other.pos_x, other.pos_y) == target
+                                              for other in coordinator.robots.values() if other is not robot)
+
+        backend.gpio.set_input_source(robot.INFRARED_PIN, infrared)
+        coordinator.add_robot(robot_id, robot)
+        return robot
+
+    def test_robots_clean_separate_lanes(self):
+        coordinator = Coordinator(RoomMap(2, 5))
+        self.add_robot(coordinator, "a", 0, 0, "N")
+        self.add_robot(coordinator, "b", 1, 0, "N")
+        report = coordinator.run({"a": "ffff", "b": "ffff"})
+        self.assertEqual(10, report["cells_cleaned"])
+        self.assertEqual(0, report["conflicts"])
+        self.assertEqual({(0, 4): "a", (1, 4): "b"}, coordinator.reservations)
+        self.assertGreater(report["cells_cleaned_per_second"], 0)
+
+    def test_robot_waits_for_reserved_cell(self):
+        coordinator = Coordinator(RoomMap(1, 5), wait_timeout=5)
+        front = self.add_robot(coordinator, "front", 0, 1, "N")
+        back = self.add_robot(coordinator, "back", 0, 0, "N")
+        report = coordinator.run({"back": "fff", "front": "fff"})
+        self.assertEqual((0, 4), (front.pos_x, front.pos_y))
+        self.assertEqual((0, 3), (back.pos_x, back.pos_y))
+        self.assertEqual(0, report["robots"]["back"]["blocked_moves"])
+        self.assertEqual(5, report["cells_cleaned"])
+
+    def test_facing_robots_skip_conflicting_moves(self):
+        coordinator = Coordinator(RoomMap(3, 1), wait_timeout=0.01)
+        left = self.add_robot(coordinator, "left", 0, 0, "E")
+        right = self.add_robot(coordinator, "right", 2, 0, "W")
+        report = coordinator.run({"left": "ff", "right": "ff"})
+        ##Only one of them gets the middle cell, the other one never hits it
+        self.assertEqual(1, report["robots"]["left"]["moves"] + report["robots"]["right"]["moves"])
+        self.assertEqual(0, report["robots"]["left"]["blocked_moves"] + report["robots"]["right"]["blocked_moves"])
+        self.assertNotEqual((left.pos_x, left.pos_y), (right.pos_x, right.pos_y))
+        self.assertGreater(report["conflicts"], 0)
+        timed_out = report["robots"]["left"]["timed_out"] + report["robots"]["right"]["timed_out"]
+        self.assertEqual(report["conflicts"], len(timed_out))
+        self.assertIn((1, 0), [target for _, target in timed_out])
+
+    def test_cell_held_further_ahead_times_out(self):
+        coordinator = Coordinator(RoomMap(1, 5), wait_timeout=0.01, lookahead=3)
+        robot = self.add_robot(coordinator, "a", 0, 0, "N")
+        coordinator.reserve("b", (0, 3))
+        report = coordinator.run({"a": "fff"})
+        ##The first move needs (0, 3) in its window, the last two do not
+        self.assertEqual([(0, (0, 1))], report["robots"]["a"]["timed_out"])
+        self.assertEqual((0, 2), (robot.pos_x, robot.pos_y))
+        self.assertEqual({(0, 2): "a", (0, 3): "b"}, coordinator.reservations)
+
+    def test_window_follows_the_route(self):
+        coordinator = Coordinator(RoomMap(3, 3), lookahead=3)
+        robot = self.add_robot(coordinator, "a", 0, 0, "N")
+        self.assertEqual([(0, 1), (1, 1), (2, 1)], coordinator.window(robot, "frfff"))
+        self.assertEqual([(0, 1), (0, 2)], coordinator.window(robot, "ffff"))
+
+    def test_obstacles_are_shared(self):
+        coordinator = Coordinator(RoomMap(2, 3))
+        self.add_robot(coordinator, "a", 0, 0, "N", obstacles={(0, 1)})
+        report = coordinator.run({"a": "f"})
+        self.assertEqual(1, report["robots"]["a"]["blocked_moves"])
+        self.assertTrue(coordinator.room_map.is_obstacle(0, 1))
+        self.assertEqual({(0, 0): "a"}, coordinator.reservations)
+
+    def test_wall_is_not_entered(self):
+        coordinator = Coordinator(RoomMap(1, 1))
+        robot = self.add_robot(coordinator, "a", 0, 0, "N")
+        report = coordinator.run({"a": "f"})
+        self.assertEqual(1, report["robots"]["a"]["blocked_moves"])
+        self.assertEqual((0, 0), (robot.pos_x, robot.pos_y))
+
+    def test_robots_cannot_share_a_cell(self):
+        coordinator = Coordinator(RoomMap(2, 2))
+        self.add_robot(coordinator, "a", 0, 0, "N")
+        self.assertRaises(CleaningRobotError, self.add_robot, coordinator, "b", 0, 0, "E")
+
+    def test_release_wakes_waiting_robot(self):
+        coordinator = Coordinator(RoomMap(2, 2))
+        coordinator.reserve("a", (1, 1))
+        timer = threading.Timer(0.05, coordinator.release, ("a", (1, 1)))
+        timer.start()
+        self.assertTrue(coordinator.reserve("b", (1, 1), timeout=5))
+        timer.join()
+        self.assertEqual("b", coordinator.holder((1, 1)))
@@ -0,0 +1,73 @@
+from unittest import TestCase
+from unittest.mock import Mock
+
+from src.backends import SimulatedBackend
+from src.cleaning_robot import CleaningRobot, CleaningRobotError
+from src.coverage_map import CoverageMap
+from src.room_map import RoomMap
+
+
+class TestCoverageMap(TestCase):
+
+    def test_record_visit(self):
+        now = Mock(return_value=10.0)
+        coverage_map = CoverageMap(3, 3, clock=now)
+        coverage_map.record_visit(1, 2)
+        now.return_value = 12.5
+        coverage_map.record_visit(1, 2)
+        self.assertEqual(2, coverage_map.visit_count(1, 2))
+        self.assertEqual(12.5, coverage_map.last_cleaned(1, 2))
+        self.assertIsNone(coverage_map.last_cleaned(0, 0))
+        self.assertEqual(1, coverage_map.cleaned_cells)
+
+    def test_visit_outside_room_is_ignored(self):
+        coverage_map = CoverageMap(2, 2)
+        coverage_map.record_visit(2, 0)
+        self.assertEqual(0, coverage_map.cleaned_cells)
+        self.assertEqual(0, coverage_map.visit_count(2, 0))
+
+    def test_visit_count_saturates(self):
+        coverage_map = CoverageMap(1, 1)
+        coverage_map.visits[0] = CoverageMap.MAX_VISITS
+        coverage_map.record_visit(0, 0)
+        self.assertEqual(CoverageMap.MAX_VISITS, coverage_map.visit_count(0, 0))
+
+    def test_coverage(self):
+        coverage_map = CoverageMap(2, 2)
+        coverage_map.record_visit(0, 0)
+        coverage_map.record_visit(0, 1)
+        self.assertEqual(50.0, coverage_map.coverage())
+        room_map = RoomMap(2, 2)
+        room_map.mark_obstacle(1, 1)
+        room_map.mark_obstacle(0, 1)
+        self.assertEqual(50.0, coverage_map.coverage(room_map))
+
+    def test_uncleaned_regions(self):
+        coverage_map = CoverageMap(5, 2)
+        coverage_map.record_visit(2, 0)
+        for x in range(5):
+            coverage_map.record_visit(x, 1)
+        self.assertEqual([(0, 0, 1), (0, 3, 4)], coverage_map.uncleaned_regions())
+        self.assertEqual([(0, 1, 1), (0, 3, 3)], coverage_map.uncleaned_regions(1, 0, 3, 1))
+
+    def test_views_are_read_only(self):
+        coverage_map = CoverageMap(2, 2)
+        coverage_map.record_visit(1, 1)
+        visits, cleaned_at = coverage_map.views()
+        self.assertEqual(1, visits[3])
+        self.assertEqual(4, len(cleaned_at))
+        self.assertRaises(TypeError, visits.__setitem__, 0, 1)
+
+    def test_invalid_size(self):
+        self.assertRaises(CleaningRobotError, CoverageMap, 0, 3)
+
+    def test_robot_records_successful_moves(self):
+        backend = SimulatedBackend()
+        robot = CleaningRobot(backend)
+        robot.initialize_robot()
+        robot.coverage_map = CoverageMap(3, 3)
+        backend.gpio.script_input(robot.INFRARED_PIN, [False, True, False])
+        robot.execute_commands("ffrf")
+        self.assertEqual([(0, 1), (1, 1)], [(x, y) for x in range(3) for y in range(3)
+                                            if robot.coverage_map.visit_count(x, y)])
+        self.assertEqual(0, robot.coverage_map.visit_count(0, 2))
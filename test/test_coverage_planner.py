@@ -0,0 +1,66 @@
+from unittest import TestCase
+from unittest.mock import patch
+
+from src.backends import SimulatedBackend
+from src.cleaning_robot import CleaningRobot
+from src.coverage_planner import CoveragePlanner, shortest_path, sweep_order
+from src.room_map import RoomMap
+from src.route_planner import preview_route
+
+
+class TestCoveragePlanner(TestCase):
+
+    def create_robot(self, width: int, height: int, obstacles: set) -> CleaningRobot:
+        backend = SimulatedBackend()
+        robot = CleaningRobot(backend)
+        robot.initialize_robot()
+
+        def front_blocked() -> bool:
+            x, y = robot.neighbour_cell(robot.pos_x, robot.pos_y, robot.heading)
+            return not (0 <= x < width and 0 <= y < height) or (x, y) in obstacles
+
+        backend.gpio.set_input_source(robot.INFRARED_PIN, front_blocked)
+        return robot
+
+    def test_sweep_order(self):
+        self.assertEqual([(0, 0), (1, 0), (1, 1), (0, 1)], sweep_order(2, 2, along_x=True))
+
+    def test_shortest_path_around_obstacle(self):
+        room_map = RoomMap(3, 3)
+        room_map.mark_obstacle(0, 1)
+        self.assertEqual(["r", "f", "l", "f", "f", "l", "f"], shortest_path(room_map, 0, 0, "N", 0, 2))
+
+    def test_shortest_path_unreachable(self):
+        room_map = RoomMap(3, 3)
+        room_map.mark_obstacle(1, 0)
+        room_map.mark_obstacle(0, 1)
+        self.assertIsNone(shortest_path(room_map, 0, 0, "N", 2, 2))
+
+    def test_plan_covers_every_free_cell(self):
+        room_map = RoomMap(4, 3)
+        room_map.mark_obstacle(2, 1)
+        commands = CoveragePlanner(room_map).plan(0, 0, "N")
+        visited = {(x, y) for x, y, _ in preview_route(commands, obstacles=[(2, 1)]).poses()} | {(0, 0)}
+        self.assertEqual(11, len(visited))
+        self.assertEqual([], preview_route(commands, obstacles=[(2, 1)]).blocked_steps())
+
+    def test_plan_lanes_along_longer_side(self):
+        commands = CoveragePlanner(RoomMap(2, 6)).plan(0, 0, "N")
+        self.assertEqual(2, commands.count("l") + commands.count("r"))
+
+    def test_run_replans_on_unknown_obstacle(self):
+        obstacles = {(1, 1), (2, 3)}
+        robot = self.create_robot(4, 4, obstacles)
+        planner = CoveragePlanner(RoomMap(4, 4))
+        planner.run(robot)
+        self.assertEqual(14, len(planner.covered))
+        self.assertEqual(set(), planner.covered & obstacles)
+        self.assertEqual([], planner.uncovered_cells())
+
+    def test_run_repairs_only_affected_segments(self):
+        with patch("src.coverage_planner.shortest_path", wraps=shortest_path) as counted:
+            CoveragePlanner(RoomMap(4, 4)).plan(0, 0, "N")
+            planning_calls = counted.call_count
+            counted.reset_mock()
+            CoveragePlanner(RoomMap(4, 4)).run(self.create_robot(4, 4, {(2, 3)}))
+        self.assertLess(counted.call_count - planning_calls, 5)
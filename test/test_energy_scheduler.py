@@ -0,0 +1,57 @@
+from unittest import TestCase
+
+from src.backends import SimulatedBackend
+from src.cleaning_robot import CleaningRobot, CleaningRobotError
+from src.energy_scheduler import EnergyScheduler
+from src.room_map import RoomMap
+
+
+class TestEnergyScheduler(TestCase):
+
+    def test_route_kept_when_charge_is_enough(self):
+        scheduler = EnergyScheduler(RoomMap(5, 5))
+        self.assertEqual(list("ffrff"), scheduler.schedule("ffrff", 0, 0, "N", 50))
+
+    def test_route_cut_and_way_back_appended(self):
+        scheduler = EnergyScheduler(RoomMap(1, 10), forward_energy=1, rotation_energy=1, reserve=0)
+        route = scheduler.schedule("f" * 9, 0, 0, "N", 16)
+        ##After 2 moves the robot needs 2 rotations and 2 moves to get back: 2 + 4 = 6 = 16 - 10
+        self.assertEqual(list("ff"), route[:2])
+        self.assertEqual(["f", "f"], route[-2:])
+        self.assertEqual(6, scheduler.energy(route))
+
+    def test_not_enough_charge_to_go_back(self):
+        scheduler = EnergyScheduler(RoomMap(1, 10), forward_energy=1, rotation_energy=1)
+        self.assertRaises(CleaningRobotError, scheduler.schedule, "f", 0, 5, "N", 12)
+
+    def test_unreachable_charger(self):
+        walled_off = RoomMap(3, 3)
+        walled_off.mark_obstacle(1, 0)
+        walled_off.mark_obstacle(1, 1)
+        walled_off.mark_obstacle(1, 2)
+        scheduler = EnergyScheduler(walled_off)
+        self.assertRaises(CleaningRobotError, scheduler.schedule, "f", 2, 0, "N", 100, go_back=True)
+        blocked_charger = RoomMap(3, 3)
+        blocked_charger.mark_obstacle(0, 0)
+        scheduler = EnergyScheduler(blocked_charger)
+        self.assertRaises(CleaningRobotError, scheduler.schedule, "f", 2, 0, "N", 100, go_back=True)
+
+    def test_run_returns_to_charger(self):
+        backend = SimulatedBackend(charge=20, discharge={CleaningRobot.PWMA: 1, CleaningRobot.PWMB: 1})
+        robot = CleaningRobot(backend)
+        robot.initialize_robot()
+        scheduler = EnergyScheduler(RoomMap(1, 20), forward_energy=1, rotation_energy=1, reserve=1)
+        results = scheduler.run(robot, "f" * 19)
+        self.assertEqual((0, 0), (robot.pos_x, robot.pos_y))
+        self.assertFalse(any(result.startswith("!") for result in results))
+        self.assertGreater(backend.ibs.get_charge_left(), 10)
+
+    def test_run_reschedules_on_new_obstacle(self):
+        backend = SimulatedBackend(charge=100)
+        robot = CleaningRobot(backend)
+        robot.initialize_robot()
+        backend.gpio.script_input(robot.INFRARED_PIN, [False, True, False])
+        scheduler = EnergyScheduler(RoomMap(3, 3))
+        results = scheduler.run(robot, "ffrf")
+        self.assertEqual(["(0,1,N)", "(0,1,N)(0,2)", "(0,1,E)", "(1,1,E)"], results)
+        self.assertTrue(scheduler.room_map.is_obstacle(0, 2))
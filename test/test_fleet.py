@@ -0,0 +1,34 @@
+from unittest import TestCase
+
+from src.fleet import FleetJob, random_jobs, run_fleet, simulate_robot
+
+
+class TestFleet(TestCase):
+
+    def test_simulate_robot_blocked_by_obstacle_and_wall(self):
+        job = FleetJob("fffrfff", 2, 3, obstacles=[(0, 2)])
+        report = simulate_robot(job)
+        self.assertEqual((1, 1, "E"), report["final_pose"])
+        self.assertEqual(2, report["forward_moves"])
+        self.assertEqual(4, report["blocked_moves"])
+
+    def test_simulate_robot_battery_depleted(self):
+        job = FleetJob("f" * 10, 1, 20, charge=15, forward_discharge=1)
+        report = simulate_robot(job)
+        self.assertTrue(report["battery_depleted"])
+        self.assertEqual(5, report["commands"])
+
+    def test_robots_are_isolated(self):
+        first = simulate_robot(FleetJob("ff", 5, 5, obstacles=[(0, 1)]))
+        second = simulate_robot(FleetJob("ff", 5, 5))
+        self.assertEqual((0, 0, "N"), first["final_pose"])
+        self.assertEqual((0, 2, "N"), second["final_pose"])
+
+    def test_run_fleet(self):
+        jobs = random_jobs(8, 6, 6, 50, obstacle_density=0.2, seed=1)
+        report = run_fleet(jobs, max_workers=2, chunksize=2)
+        self.assertEqual(8, report["robot_count"])
+        self.assertEqual([simulate_robot(job)["final_pose"] for job in jobs],
+                         [robot["final_pose"] for robot in report["robots"]])
+        self.assertEqual(report["commands"], report["forward_moves"] + report["blocked_moves"]
+                         + sum(job.route.count("l") + job.route.count("r") for job in jobs))
@@ -0,0 +1,98 @@
+import json
+import os
+import tempfile
+from unittest import TestCase
+
+from src.backends import SimulatedBackend
+from src.cleaning_robot import CleaningRobot
+from src.clock import VirtualClock
+from src.instrumentation import Histogram, Instrumentation
+
+
+class TestInstrumentation(TestCase):
+
+    def create_robot(self) -> CleaningRobot:
+        backend = SimulatedBackend()
+        backend.gpio.script_input(CleaningRobot.INFRARED_PIN, [False, True])
+        robot = CleaningRobot(backend)
+        robot.initialize_robot()
+        return robot
+
+    def test_histogram(self):
+        histogram = Histogram()
+        histogram.observe(0.0002)
+        histogram.observe(10)
+        self.assertEqual(1, histogram.counts[1])
+        self.assertEqual(1, histogram.counts[-1])
+        self.assertEqual(2, histogram.cumulative_counts()[-1])
+
+    def test_measures_commands(self):
+        robot = self.create_robot()
+        instrumentation = robot.enable_instrumentation()
+        robot.execute_command(robot.FORWARD)
+        robot.execute_command(robot.FORWARD)
+        robot.execute_commands("lr")
+        self.assertEqual(2, instrumentation.histograms["execute_command"].count)
+        self.assertEqual(1, instrumentation.histograms["wheel_motor"].count)
+        self.assertEqual(2, instrumentation.histograms["rotation_motor"].count)
+        self.assertEqual(3, instrumentation.histograms["ibs_read"].count)
+        self.assertEqual({"commands": 4, "gpio_writes": 24, "obstacle_hits": 1}, instrumentation.counters)
+
+    def test_latencies_follow_robot_clock(self):
+        robot = CleaningRobot(SimulatedBackend(), clock=VirtualClock())
+        robot.initialize_robot()
+        instrumentation = robot.enable_instrumentation()
+        robot.execute_command(robot.RIGHT)
+        histograms = instrumentation.histograms
+        self.assertEqual(robot.MOTOR_TIME, histograms["rotation_motor"].sum)
+        self.assertEqual(1, histograms["rotation_motor"].counts[Histogram.BOUNDS.index(1.0)])
+        self.assertAlmostEqual(VirtualClock.LATENCIES["ibs"], histograms["ibs_read"].sum)
+        self.assertAlmostEqual(robot.clock.now(), histograms["execute_command"].sum)
+
+    def test_counts_only_writes_reaching_the_bus(self):
+        robot = self.create_robot()
+        robot.enable_pin_shadow()
+        instrumentation = robot.enable_instrumentation()
+        robot.manage_cleaning_system()
+        robot.manage_cleaning_system()
+        self.assertEqual(2, instrumentation.counters["gpio_writes"])
+
+    def test_disable_restores_robot(self):
+        robot = self.create_robot()
+        gpio = robot.gpio
+        robot.enable_instrumentation()
+        robot.disable_instrumentation()
+        self.assertIs(gpio, robot.gpio)
+        self.assertNotIn("execute_command", robot.__dict__)
+        self.assertIsNone(robot.instrumentation)
+
+    def test_detach_in_any_order(self):
+        robot = self.create_robot()
+        gpio, ibs = robot.gpio, robot.battery.ibs
+        first = Instrumentation().attach(robot)
+        second = Instrumentation().attach(robot)
+        first.detach()
+        robot.execute_command(robot.RIGHT)
+        self.assertEqual(0, first.counters["commands"])
+        self.assertEqual(1, second.counters["commands"])
+        self.assertEqual(1, second.histograms["ibs_read"].count)
+        second.detach()
+        self.assertIs(gpio, robot.gpio)
+        self.assertIs(ibs, robot.battery.ibs)
+        for name in ["execute_command", "_execute_command", "activate_wheel_motor", "activate_rotation_motor"]:
+            self.assertNotIn(name, robot.__dict__)
+
+    def test_export(self):
+        robot = self.create_robot()
+        instrumentation = robot.enable_instrumentation()
+        robot.execute_command(robot.RIGHT)
+        with tempfile.TemporaryDirectory() as directory:
+            instrumentation.export(os.path.join(directory, "metrics.prom"))
+            instrumentation.export(os.path.join(directory, "metrics.json"))
+            with open(os.path.join(directory, "metrics.prom")) as prometheus_file:
+                prometheus = prometheus_file.read()
+            with open(os.path.join(directory, "metrics.json")) as json_file:
+                exported = json.load(json_file)
+        self.assertIn('cleaning_robot_rotation_motor_seconds_bucket{le="+Inf"} 1\n', prometheus)
+        self.assertIn("cleaning_robot_commands_total 1\n", prometheus)
+        self.assertEqual(1, exported["histograms"]["execute_command"]["count"])
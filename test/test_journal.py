@@ -0,0 +1,89 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from src.backends import SimulatedBackend
+from src.cleaning_robot import CleaningRobot, CleaningRobotError
+from src.journal import Journal, read_journal, replay
+from src.room_map import RoomMap
+
+
+class TestJournal(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "robot.journal")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def record(self, route: str) -> CleaningRobot:
+        backend = SimulatedBackend(charge=12, discharge={CleaningRobot.PWMA: 1})
+        backend.gpio.script_input(CleaningRobot.INFRARED_PIN, [False, True, False])
+        robot = CleaningRobot(backend)
+        robot.initialize_robot()
+        journal = Journal(self.path).attach(robot)
+        robot.execute_commands(route, battery_check_interval=1)
+        journal.close()
+        return robot
+
+    def test_read_journal(self):
+        self.record("ffrff")
+        start, entries = read_journal(self.path)
+        self.assertEqual((0, 0, "N"), start)
+        self.assertEqual(["f", "f", "r", "f", "f"], [entry.command for entry in entries])
+        self.assertEqual([False, True, None, False, None], [entry.infrared for entry in entries])
+        self.assertEqual([12, 11, 11, 11, 10], [entry.battery for entry in entries])
+        self.assertEqual((0, 1, "N", True, False), entries[1][3:])
+        self.assertEqual((1, 1, "E", False, False), entries[3][3:])
+
+    def test_replay_matches_recording(self):
+        robot = self.record("ffrff")
+        report = replay(self.path)
+        self.assertEqual(5, report["commands"])
+        self.assertEqual([], report["mismatches"])
+        self.assertEqual("(1,1,E)", robot.robot_status())
+
+    def test_replay_with_room_map_and_estimated_charge(self):
+        backend = SimulatedBackend(charge=100)
+        robot = CleaningRobot(backend)
+        robot.initialize_robot()
+        robot.room_map = RoomMap(3, 3)
+        robot.room_map.mark_obstacle(0, 2)
+        robot.battery.forward_discharge = 45
+        robot.battery.rotation_discharge = 45
+        journal = Journal(self.path).attach(robot)
+        ##The obstacle is known from the map, and the refusal comes from the estimated charge
+        self.assertEqual(["(0,1,N)", "(0,1,N)(0,2)", "(0,1,E)", "!(0,1,E)"], robot.execute_commands("ffrf"))
+        journal.close()
+        entries = read_journal(self.path)[1]
+        self.assertEqual([False, None, None, None], [entry.infrared for entry in entries])
+        self.assertEqual([False, True, False, False], [entry.blocked for entry in entries])
+        self.assertEqual([False, False, False, True], [entry.refused for entry in entries])
+        self.assertEqual([], replay(self.path)["mismatches"])
+
+    def test_close_detaches_robot(self):
+        robot = self.record("f")
+        self.assertNotIn("_execute_command", robot.__dict__)
+        robot.execute_command(robot.FORWARD)
+        self.assertEqual(1, len(read_journal(self.path)[1]))
+
+    def test_close_before_instrumentation_is_disabled(self):
+        robot = CleaningRobot(SimulatedBackend())
+        robot.initialize_robot()
+        ibs = robot.battery.ibs
+        journal = Journal(self.path).attach(robot)
+        instrumentation = robot.enable_instrumentation()
+        journal.close()
+        robot.execute_command(robot.FORWARD)
+        self.assertEqual(1, instrumentation.counters["commands"])
+        self.assertEqual(0, journal.entries)
+        robot.disable_instrumentation()
+        self.assertIs(ibs, robot.battery.ibs)
+        self.assertNotIn("_execute_command", robot.__dict__)
+        self.assertNotIn("obstacle_found", robot.__dict__)
+
+    def test_not_a_journal(self):
+        with open(self.path, "wb") as journal_file:
+            journal_file.write(b"garbage data")
+        self.assertRaises(CleaningRobotError, read_journal, self.path)
@@ -0,0 +1,106 @@
+import os
+import tempfile
+from unittest import TestCase
+from unittest.mock import patch
+
+from src.backends import Backend, SimulatedBackend, SimulatedGPIO, SimulatedIBS
+from src.cleaning_robot import CleaningRobot, CleaningRobotError
+from src.journal import Journal, read_journal, replay
+
+
+class TestMoveForward(TestCase):
+
+    def create_robot(self, realtime: bool = False) -> CleaningRobot:
+        gpio = SimulatedGPIO()
+        robot = CleaningRobot(Backend(gpio, SimulatedIBS(100, gpio), realtime=realtime))
+        robot.initialize_robot()
+        return robot
+
+    def test_move_forward(self):
+        robot = self.create_robot()
+        self.assertEqual(["(0,1,N)", "(0,2,N)", "(0,3,N)"], robot.move_forward(3))
+        self.assertEqual([0, 20.0, 40.0, 60.0, 80.0, 100.0, 80.0, 60.0, 40.0, 20.0, 0.0], robot.wheel_pwm.duty_cycles)
+        self.assertFalse(robot.wheel_pwm.running)
+        self.assertEqual(0, robot.gpio.pins[robot.PWMA])
+        self.assertEqual(0, robot.gpio.pins[robot.STBY])
+
+    def test_move_forward_checks_every_cell(self):
+        robot = self.create_robot()
+        robot.gpio.script_input(robot.INFRARED_PIN, [False, True, True])
+        self.assertEqual(["(0,1,N)", "(0,1,N)(0,2)", "(0,1,N)(0,2)"], robot.move_forward(3))
+        self.assertTrue(robot.block_way)
+        self.assertFalse(robot.wheel_pwm.running)
+
+    def test_move_forward_resumes_after_obstacle_leaves(self):
+        robot = self.create_robot()
+        robot.gpio.script_input(robot.INFRARED_PIN, [False, True, False])
+        self.assertEqual(["(0,1,N)", "(0,1,N)(0,2)", "(0,2,N)"], robot.move_forward(3))
+
+    def test_move_forward_with_low_battery(self):
+        robot = self.create_robot()
+        robot.ibs.charge = 10
+        self.assertEqual(["!(0,0,N)"], robot.move_forward(3))
+        self.assertIsNone(robot.wheel_pwm)
+
+    def test_invalid_number_of_cells(self):
+        robot = self.create_robot()
+        self.assertRaises(CleaningRobotError, robot.move_forward, 0)
+
+    def test_merged_route_matches_single_moves(self):
+        route = "fffrfflffff"
+        merged = SimulatedBackend(discharge={CleaningRobot.PWMA: 1})
+        single = SimulatedBackend(discharge={CleaningRobot.PWMA: 1})
+        results = []
+        robots = []
+        for backend, merge in [(merged, True), (single, False)]:
+            robot = CleaningRobot(backend)
+            robots.append(robot)
+            robot.initialize_robot()
+            backend.gpio.script_input(robot.INFRARED_PIN, [False] * 6 + [True] + [False] * 10)
+            results.append(robot.execute_commands(route, merge_forward=merge))
+        self.assertEqual(results[1], results[0])
+        ##Fewer motor starts, but the same drain on the battery per cell, in less time
+        self.assertLess(merged.gpio.rising_edges[CleaningRobot.PWMA], single.gpio.rising_edges[CleaningRobot.PWMA])
+        self.assertEqual(single.ibs.get_charge_left(), merged.ibs.get_charge_left())
+        self.assertLess(robots[0].clock.now(), robots[1].clock.now())
+
+    def test_merged_route_reads_battery_on_interval(self):
+        robot = self.create_robot()
+        robot.execute_commands("f" * 10 + "r" + "f" * 10, battery_check_interval=8, merge_forward=True)
+        self.assertEqual(3, robot.ibs.reads)
+
+    def test_merged_route_stops_on_low_battery(self):
+        results = []
+        for merge in [True, False]:
+            robot = CleaningRobot(SimulatedBackend(charge=15, discharge={CleaningRobot.PWMA: 1}))
+            robot.initialize_robot()
+            results.append(robot.execute_commands("f" * 20, battery_check_interval=5, merge_forward=merge))
+            self.assertFalse(robot.wheel_moving)
+        self.assertEqual(results[1], results[0])
+        self.assertEqual(6, len(results[0]))
+        self.assertEqual("!(0,5,N)", results[0][-1])
+
+    def test_merged_moves_are_journaled_and_instrumented(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "robot.journal")
+            robot = self.create_robot()
+            instrumentation = robot.enable_instrumentation()
+            journal = Journal(path).attach(robot)
+            robot.execute_commands("ffff", merge_forward=True)
+            journal.close()
+            self.assertEqual(4, len(read_journal(path)[1]))
+            self.assertEqual([], replay(path)["mismatches"])
+        self.assertEqual(4, instrumentation.counters["commands"])
+        self.assertEqual(4, instrumentation.histograms["wheel_motor"].count)
+
+    def test_straight_line_is_faster(self):
+        with patch("time.sleep") as sleep:
+            self.create_robot(realtime=True).move_forward(10)
+            continuous = sum(call.args[0] for call in sleep.call_args_list)
+            sleep.reset_mock()
+            robot = self.create_robot(realtime=True)
+            for _ in range(10):
+                robot.execute_command(robot.FORWARD)
+            stop_start = sum(call.args[0] for call in sleep.call_args_list)
+        self.assertAlmostEqual(10 * CleaningRobot.CRUISE_TIME + 2 * CleaningRobot.RAMP_TIME, continuous)
+        self.assertAlmostEqual(10 * CleaningRobot.MOTOR_TIME, stop_start)
@@ -0,0 +1,82 @@
+from unittest import TestCase
+
+from src.backends import SimulatedBackend
+from src.cleaning_robot import CleaningRobot, CleaningRobotError
+from src.coverage_planner import shortest_path
+from src.navigation import DStarLite
+from src.room_map import RoomMap
+
+
+class TestNavigation(TestCase):
+
+    def create_robot(self, room_map: RoomMap, obstacles: set) -> CleaningRobot:
+        backend = SimulatedBackend()
+        robot = CleaningRobot(backend)
+        robot.initialize_robot()
+        robot.room_map = room_map
+
+        def front_blocked() -> bool:
+            return robot.neighbour_cell(robot.pos_x, robot.pos_y, robot.heading) in obstacles
+
+        backend.gpio.set_input_source(robot.INFRARED_PIN, front_blocked)
+        return robot
+
+    def route_cost(self, room_map: RoomMap, pose: tuple, goal: tuple) -> int:
+        planner = DStarLite(room_map, *goal)
+        planner.set_start(*pose)
+        commands = []
+        x, y, heading = pose
+        while (x, y) != goal:
+            command = planner.next_command()
+            commands.append(command)
+            robot = CleaningRobot(SimulatedBackend())
+            robot.pos_x, robot.pos_y, robot.heading = x, y, heading
+            robot.execute_command(command)
+            x, y, heading = robot.pos_x, robot.pos_y, robot.heading
+            planner.set_start(x, y, heading)
+        return len(commands)
+
+    def test_plan_is_optimal(self):
+        room_map = RoomMap(5, 5)
+        for cell in [(1, 0), (1, 1), (1, 2), (3, 4), (3, 3), (3, 2)]:
+            room_map.mark_obstacle(*cell)
+        expected = len(shortest_path(room_map, 0, 0, "N", 4, 0))
+        self.assertEqual(expected, self.route_cost(room_map, (0, 0, "N"), (4, 0)))
+
+    def test_go_to_straight(self):
+        robot = self.create_robot(RoomMap(5, 5), set())
+        result = robot.go_to(0, 3)
+        self.assertEqual(["(0,1,N)", "(0,2,N)", "(0,3,N)"], result)
+
+    def test_go_to_repairs_plan_on_new_obstacle(self):
+        room_map = RoomMap(5, 5)
+        robot = self.create_robot(room_map, {(0, 2)})
+        robot.go_to(0, 4)
+        self.assertEqual((0, 4), (robot.pos_x, robot.pos_y))
+        self.assertTrue(room_map.is_obstacle(0, 2))
+
+    def test_go_to_unreachable(self):
+        room_map = RoomMap(3, 3)
+        robot = self.create_robot(room_map, {(0, 1), (1, 0)})
+        self.assertRaises(CleaningRobotError, robot.go_to, 2, 2)
+
+    def test_go_to_without_room_map(self):
+        robot = CleaningRobot(SimulatedBackend())
+        robot.initialize_robot()
+        self.assertRaises(CleaningRobotError, robot.go_to, 1, 1)
+
+    def test_repair_expands_less_than_new_search(self):
+        planner = DStarLite(RoomMap(20, 20), 19, 19)
+        planner.set_start(0, 0, "N")
+        planner.next_command()
+        planner.set_start(0, 1, "N")
+        expansions = planner.expansions
+        planner.add_obstacle(0, 2)
+        planner.next_command()
+
+        room_map = RoomMap(20, 20)
+        room_map.mark_obstacle(0, 2)
+        new_planner = DStarLite(room_map, 19, 19)
+        new_planner.set_start(0, 1, "N")
+        new_planner.next_command()
+        self.assertLess(planner.expansions - expansions, new_planner.expansions)
@@ -0,0 +1,45 @@
+import threading
+import time
+from unittest import TestCase
+from unittest.mock import Mock, patch
+
+from mock import GPIO
+from src.backends import Backend, SimulatedBackend, SimulatedGPIO, SimulatedIBS
+from src.cleaning_robot import CleaningRobot
+
+
+class TestObstacleInterrupts(TestCase):
+
+    @patch.object(GPIO, "add_event_detect")
+    def test_enable_registers_edge_callback(self, mock_event_detect: Mock):
+        robot = CleaningRobot()
+        robot.enable_obstacle_interrupts(bouncetime=5)
+        mock_event_detect.assert_called_once_with(robot.INFRARED_PIN, GPIO.BOTH, callback=robot.on_infrared_edge,
+                                                  bouncetime=5)
+
+    def test_edges_update_obstacle_flag_without_polling(self):
+        backend = SimulatedBackend()
+        robot = CleaningRobot(backend)
+        robot.initialize_robot()
+        robot.enable_obstacle_interrupts()
+        backend.gpio.set_input(robot.INFRARED_PIN, True)
+        self.assertEqual("(0,0,N)(0,1)", robot.execute_command(robot.FORWARD))
+        backend.gpio.set_input(robot.INFRARED_PIN, False)
+        self.assertEqual("(0,1,N)", robot.execute_command(robot.FORWARD))
+        self.assertEqual([True, False], [value for _, value in robot.edge_timestamps])
+
+    @patch.object(CleaningRobot, "MOTOR_TIME", 2)
+    def test_rising_edge_aborts_move_in_progress(self):
+        gpio = SimulatedGPIO()
+        robot = CleaningRobot(Backend(gpio, SimulatedIBS(50), realtime=True))
+        robot.initialize_robot()
+        robot.enable_obstacle_interrupts()
+        timer = threading.Timer(0.05, gpio.set_input, (robot.INFRARED_PIN, True))
+        timer.start()
+        start = time.monotonic()
+        result = robot.execute_command(robot.FORWARD)
+        timer.join()
+        self.assertLess(time.monotonic() - start, 1)
+        self.assertEqual("(0,0,N)(0,1)", result)
+        self.assertTrue(robot.move_aborted)
+        self.assertEqual(0, gpio.pins[robot.PWMA])
@@ -0,0 +1,57 @@
+from unittest import TestCase
+from unittest.mock import Mock, patch, call
+
+from mock import GPIO
+from mock.ibs import IBS
+from src.cleaning_robot import CleaningRobot
+from src.pin_shadow import PinShadow
+
+
+class TestPinShadow(TestCase):
+
+    def test_redundant_write_suppressed(self):
+        gpio = Mock()
+        shadow = PinShadow(gpio)
+        shadow.output(12, True)
+        shadow.output(12, GPIO.HIGH)
+        gpio.output.assert_called_once_with(12, True)
+        self.assertEqual({"writes_issued": 1, "writes_suppressed": 1, "batches_issued": 1}, shadow.stats())
+
+    def test_changed_pins_written_in_one_batch(self):
+        gpio = Mock()
+        shadow = PinShadow(gpio)
+        shadow.output(12, GPIO.LOW)
+        shadow.output_many([12, 13, 14], [GPIO.LOW, GPIO.HIGH, GPIO.HIGH])
+        self.assertEqual([call(12, GPIO.LOW), call([13, 14], [GPIO.HIGH, GPIO.HIGH])], gpio.output.call_args_list)
+
+    def test_invalidate(self):
+        gpio = Mock()
+        shadow = PinShadow(gpio)
+        shadow.output(12, True)
+        shadow.invalidate(12)
+        shadow.output(12, True)
+        self.assertEqual(2, gpio.output.call_count)
+
+    @patch.object(GPIO, "output")
+    @patch.object(IBS, "get_charge_left")
+    def test_manage_cleaning_system_writes_pins_once(self, mock_battery: Mock, mock_pins: Mock):
+        mock_battery.return_value = 11
+        robot = CleaningRobot()
+        shadow = robot.enable_pin_shadow()
+        robot.manage_cleaning_system()
+        robot.manage_cleaning_system()
+        mock_pins.assert_called_once_with([robot.RECHARGE_LED_PIN, robot.CLEANING_SYSTEM_PIN], [GPIO.LOW, GPIO.HIGH])
+        self.assertTrue(robot.cleaning_system_on)
+        self.assertEqual(2, shadow.writes_suppressed)
+
+    @patch.object(GPIO, "output")
+    @patch.object(GPIO, "input")
+    @patch.object(IBS, "get_charge_left")
+    def test_forward_move_batches_motor_pins(self, mock_battery: Mock, mock_infrared: Mock, mock_pins: Mock):
+        mock_battery.return_value = 11
+        mock_infrared.return_value = False
+        robot = CleaningRobot()
+        robot.initialize_robot()
+        robot.enable_pin_shadow()
+        self.assertEqual("(0,1,N)", robot.execute_command(robot.FORWARD))
+        self.assertEqual(2, mock_pins.call_count)
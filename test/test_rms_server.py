@@ -0,0 +1,177 @@
+import asyncio
+import os
+import socket
+import tempfile
+import threading
+from unittest import TestCase, skipUnless
+
+from src.backends import SimulatedBackend
+from src.cleaning_robot import CleaningRobot, CleaningRobotError
+from src.rms_server import RMSServer
+
+
+def create_robot() -> CleaningRobot:
+    robot = CleaningRobot(SimulatedBackend())
+    robot.initialize_robot()
+    return robot
+
+
+async def read_lines(reader: asyncio.StreamReader, count: int) -> list:
+    return [(await asyncio.wait_for(reader.readline(), 5)).decode().strip() for _ in range(count)]
+
+
+class TestRMSServer(TestCase):
+
+    def test_pipelined_commands(self):
+        async def session():
+            server = RMSServer(create_robot())
+            host, port = await server.start_tcp()
+            reader, writer = await asyncio.open_connection(host, port)
+            writer.write(b"f\nr\n\nf\nx\nl\n")
+            await writer.drain()
+            lines = await read_lines(reader, 5)
+            writer.close()
+            await server.close()
+            return lines
+
+        self.assertEqual(["(0,1,N)", "(0,1,E)", "(1,1,E)", "ERR x", "(1,1,N)"], asyncio.run(session()))
+
+    def test_observers_receive_telemetry(self):
+        async def session():
+            server = RMSServer(create_robot())
+            host, port = await server.start_tcp()
+            observers = [await asyncio.open_connection(host, port) for _ in range(2)]
+            for _, observer in observers:
+                observer.write(b"OBSERVE\n")
+                await observer.drain()
+            while len(server.observers) < 2:
+                await asyncio.sleep(0.01)
+            reader, writer = await asyncio.open_connection(host, port)
+            writer.write(b"f\nl\n")
+            await read_lines(reader, 2)
+            telemetry = [await read_lines(observer_reader, 2) for observer_reader, _ in observers]
+            for _, observer in observers:
+                observer.close()
+            writer.close()
+            await server.close()
+            return telemetry
+
+        expected = ["1 f (0,1,N) battery=100 cleaning=0 recharge=0 buzzer=0",
+                    "2 l (0,1,W) battery=100 cleaning=0 recharge=0 buzzer=0"]
+        self.assertEqual([expected, expected], asyncio.run(session()))
+
+    def test_slow_observer_is_dropped(self):
+        async def session():
+            server = RMSServer(create_robot(), observer_queue_size=1)
+            queue = asyncio.Queue(1)
+            server.observers.add(queue)
+            server._broadcast("1")
+            server._broadcast("2")
+            return server, queue.get_nowait()
+
+        server, last = asyncio.run(session())
+        self.assertEqual(1, server.dropped_observers)
+        self.assertEqual(set(), server.observers)
+        self.assertIsNone(last)
+
+    def test_backpressure(self):
+        robot = create_robot()
+        release = threading.Event()
+        execute_command = robot.execute_command
+
+        def blocked_execute_command(command):
+            release.wait(5)
+            return execute_command(command)
+
+        robot.execute_command = blocked_execute_command
+
+        async def session():
+            server = RMSServer(robot, queue_size=2)
+            host, port = await server.start_tcp()
+            reader, writer = await asyncio.open_connection(host, port)
+            writer.write(b"f\n" * 20)
+            await asyncio.sleep(0.1)
+            queued = server.commands.qsize()
+            release.set()
+            lines = await read_lines(reader, 20)
+            writer.close()
+            await server.close()
+            return queued, lines
+
+        queued, lines = asyncio.run(session())
+        self.assertEqual(2, queued)
+        self.assertEqual("(0,20,N)", lines[-1])
+
+    def test_failed_command_does_not_stop_the_server(self):
+        robot = create_robot()
+        execute_command = robot.execute_command
+        failures = [OSError("I2C read failed")]
+
+        def failing_execute_command(command):
+            if failures:
+                raise failures.pop()
+            return execute_command(command)
+
+        robot.execute_command = failing_execute_command
+
+        async def session():
+            server = RMSServer(robot)
+            host, port = await server.start_tcp()
+            reader, writer = await asyncio.open_connection(host, port)
+            writer.write(b"f\nf\nr\n")
+            lines = await read_lines(reader, 3)
+            done = server.runner.done()
+            writer.close()
+            await server.close()
+            return lines, done
+
+        lines, done = asyncio.run(session())
+        self.assertEqual(["ERR OSError: I2C read failed", "(0,1,N)", "(0,1,E)"], lines)
+        self.assertFalse(done)
+
+    def test_overlong_line_is_answered(self):
+        async def session():
+            server = RMSServer(create_robot())
+            host, port = await server.start_tcp()
+            reader, writer = await asyncio.open_connection(host, port)
+            writer.write(b"f\n" + b"x" * 200000 + b"\nr\n")
+            lines = await read_lines(reader, 3)
+            writer.close()
+            await server.close()
+            return lines
+
+        self.assertEqual(["(0,1,N)", "ERR line too long", "(0,1,E)"], asyncio.run(session()))
+
+    def test_restart_after_close(self):
+        async def session():
+            server = RMSServer(create_robot())
+            lines = []
+            for _ in range(2):
+                host, port = await server.start_tcp()
+                reader, writer = await asyncio.open_connection(host, port)
+                writer.write(b"f\n")
+                lines += await read_lines(reader, 1)
+                writer.close()
+                await server.close()
+            return lines
+
+        self.assertEqual(["(0,1,N)", "(0,2,N)"], asyncio.run(session()))
+
+    @skipUnless(hasattr(socket, "AF_UNIX"), "Unix sockets not available")
+    def test_unix_socket(self):
+        async def session(path):
+            server = RMSServer(create_robot())
+            await server.start_unix(path)
+            reader, writer = await asyncio.open_unix_connection(path)
+            writer.write(b"r\nf\n")
+            lines = await read_lines(reader, 2)
+            writer.close()
+            await server.close()
+            return lines
+
+        with tempfile.TemporaryDirectory() as directory:
+            lines = asyncio.run(session(os.path.join(directory, "rms.sock")))
+        self.assertEqual(["(0,0,E)", "(1,0,E)"], lines)
+
+    def test_invalid_queue_size(self):
+        self.assertRaises(CleaningRobotError, RMSServer, create_robot(), 0)
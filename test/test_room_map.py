@@ -0,0 +1,62 @@
+from unittest import TestCase
+from unittest.mock import Mock, patch
+
+from mock import GPIO
+from mock.ibs import IBS
+from src.cleaning_robot import CleaningRobot, CleaningRobotError
+from src.room_map import RoomMap
+
+
+class TestRoomMap(TestCase):
+
+    def test_mark_obstacle(self):
+        room_map = RoomMap(3, 3)
+        room_map.mark_obstacle(1, 2)
+        self.assertTrue(room_map.is_known_obstacle(1, 2))
+        self.assertFalse(room_map.is_known_obstacle(2, 1))
+
+    def test_outside_room_is_not_obstacle(self):
+        room_map = RoomMap(3, 3)
+        room_map.mark_obstacle(-1, 0)
+        self.assertFalse(room_map.is_known_obstacle(-1, 0))
+
+    def test_obstacle_expires_after_freshness(self):
+        now = Mock(return_value=100.0)
+        room_map = RoomMap(3, 3, freshness=5, clock=now)
+        room_map.mark_obstacle(0, 1)
+        now.return_value = 106.0
+        self.assertFalse(room_map.is_known_obstacle(0, 1))
+        self.assertTrue(room_map.is_obstacle(0, 1))
+
+    def test_obstacles_in_region(self):
+        room_map = RoomMap(5, 5)
+        for cell in [(0, 0), (2, 1), (4, 1), (3, 3)]:
+            room_map.mark_obstacle(*cell)
+        self.assertEqual([(2, 1), (4, 1), (3, 3)], room_map.obstacles_in_region(1, 1, 4, 3))
+        self.assertEqual(4, room_map.count_obstacles())
+
+    def test_empty_room(self):
+        self.assertRaises(CleaningRobotError, RoomMap, 0, 3)
+
+    @patch.object(IBS, "get_charge_left")
+    @patch.object(GPIO, "input")
+    def test_execute_command_records_obstacle(self, mock_infrared: Mock, mock_battery: Mock):
+        mock_battery.return_value = 11
+        mock_infrared.return_value = True
+        robot = CleaningRobot()
+        robot.initialize_robot()
+        robot.room_map = RoomMap(3, 3)
+        robot.execute_command(robot.FORWARD)
+        self.assertTrue(robot.room_map.is_known_obstacle(0, 1))
+
+    @patch.object(IBS, "get_charge_left")
+    @patch.object(CleaningRobot, "obstacle_found")
+    def test_execute_command_skips_infrared_for_known_obstacle(self, mock_obstacle: Mock, mock_battery: Mock):
+        mock_battery.return_value = 11
+        robot = CleaningRobot()
+        robot.initialize_robot()
+        robot.room_map = RoomMap(3, 3)
+        robot.room_map.mark_obstacle(0, 1)
+        result = robot.execute_command(robot.FORWARD)
+        mock_obstacle.assert_not_called()
+        self.assertEqual("(0,0,N)(0,1)", result)
@@ -0,0 +1,63 @@
+import random
+from unittest import TestCase, skipUnless
+from unittest.mock import Mock, patch
+
+from mock import GPIO
+from mock.ibs import IBS
+from src.cleaning_robot import CleaningRobot, CleaningRobotError
+from src import route_planner
+from src.route_planner import preview_route
+
+
+class TestRoutePlanner(TestCase):
+
+    def test_preview_route_rotations(self):
+        preview = preview_route("llrrr")
+        self.assertEqual([(0, 0, "W"), (0, 0, "S"), (0, 0, "W"), (0, 0, "N"), (0, 0, "E")], preview.poses())
+
+    def test_preview_route_unobstructed(self):
+        preview = preview_route("ffrff", x=1, y=1, heading="S")
+        self.assertEqual((-1, -1, "W"), preview.poses()[-1])
+        self.assertEqual([], preview.blocked_steps())
+
+    def test_preview_route_obstacle(self):
+        preview = preview_route("fffrf", obstacles=[(0, 2)])
+        self.assertEqual([(0, 1, "N"), (0, 1, "N"), (0, 1, "N"), (0, 1, "E"), (1, 1, "E")], preview.poses())
+        self.assertEqual([1, 2], preview.blocked_steps())
+
+    def test_preview_route_invalid_command(self):
+        self.assertRaises(CleaningRobotError, preview_route, "fu")
+
+    @skipUnless(route_planner.np, "NumPy is not installed: nothing to compare the fallback with")
+    def test_preview_route_python_fallback_matches(self):
+        route = "ffrfflfffrrffflf" * 5
+        obstacles = [(1, 2), (3, 3), (-2, 4)]
+        with patch.object(route_planner, "np", None):
+            expected = preview_route(route, obstacles=obstacles)
+        preview = preview_route(route, obstacles=obstacles)
+        self.assertEqual(expected.poses(), preview.poses())
+        self.assertEqual(expected.blocked_steps(), preview.blocked_steps())
+
+    @skipUnless(route_planner.np, "NumPy is not installed: nothing to compare the fallback with")
+    def test_preview_route_many_obstacles_matches_fallback(self):
+        generator = random.Random(7)
+        route = "".join(generator.choice("fffflr") for _ in range(5000))
+        obstacles = [(generator.randint(-15, 15), generator.randint(-15, 15)) for _ in range(300)]
+        with patch.object(route_planner, "np", None):
+            expected = preview_route(route, obstacles=obstacles)
+        preview = preview_route(route, obstacles=obstacles)
+        self.assertGreater(len(expected.blocked_steps()), route_planner.PREVIEW_WINDOW)
+        self.assertEqual(expected.poses(), preview.poses())
+        self.assertEqual(expected.blocked_steps(), preview.blocked_steps())
+
+    @patch.object(IBS, "get_charge_left")
+    @patch.object(GPIO, "input")
+    def test_preview_route_matches_robot(self, mock_infrared: Mock, mock_battery: Mock):
+        mock_battery.return_value = 11
+        mock_infrared.return_value = False
+        robot = CleaningRobot()
+        robot.initialize_robot()
+        route = "ffrffflffllfrf"
+        statuses = robot.execute_commands(route)
+        expected = ["(" + str(x) + "," + str(y) + "," + h + ")" for x, y, h in preview_route(route).poses()]
+        self.assertEqual(expected, statuses)
@@ -0,0 +1,75 @@
+import io
+import os
+import tempfile
+import tracemalloc
+from unittest import TestCase
+
+from src.backends import SimulatedBackend
+from src.cleaning_robot import CleaningRobot, CleaningRobotError
+from src.route_stream import generate_route, read_commands, run_route_stream
+
+
+def create_robot(charge: float = 100) -> CleaningRobot:
+    robot = CleaningRobot(SimulatedBackend(charge))
+    robot.initialize_robot()
+    return robot
+
+
+class TestRouteStream(TestCase):
+
+    def test_read_commands_from_file_objects(self):
+        self.assertEqual(list("ffrl"), list(read_commands(io.StringIO("ff\nr l\n"), read_size=3)))
+        self.assertEqual(list("ffrl"), list(read_commands(io.BytesIO(b"ffr\nl"))))
+        self.assertEqual(list("fr"), list(read_commands(iter(["f", "\n", "r"]))))
+
+    def test_read_commands_from_path(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "route.txt")
+            with open(path, "w") as route_file:
+                route_file.write("frf\n")
+            self.assertEqual(list("frf"), list(read_commands(path)))
+
+    def test_chunks(self):
+        robot = create_robot()
+        chunks = list(run_route_stream(robot, io.StringIO("ffrff\nlf"), chunk_size=3))
+        self.assertEqual([0, 1, 2], [chunk.index for chunk in chunks])
+        self.assertEqual([3, 3, 1], [chunk.commands for chunk in chunks])
+        self.assertEqual(["(0,1,N)", "(0,2,N)", "(0,2,E)"], chunks[0].results)
+        self.assertEqual((2, 3, "N"), chunks[-1].pose)
+        self.assertEqual(7, chunks[-1].total_commands)
+
+    def test_stream_is_lazy(self):
+        robot = create_robot()
+        read = []
+
+        def route():
+            for command in "ffff":
+                read.append(command)
+                yield command
+
+        chunks = run_route_stream(robot, route(), chunk_size=2)
+        next(chunks)
+        self.assertEqual(2, len(read))
+
+    def test_stops_on_low_battery(self):
+        robot = create_robot(charge=10)
+        chunks = list(run_route_stream(robot, generate_route(100), chunk_size=10))
+        self.assertEqual(1, len(chunks))
+        self.assertEqual(["!(0,0,N)"], chunks[0].results)
+
+    def test_invalid_command(self):
+        robot = create_robot()
+        self.assertRaises(CleaningRobotError, list, run_route_stream(robot, iter("fx")))
+
+    def test_constant_memory(self):
+        robot = create_robot()
+        tracemalloc.start()
+        try:
+            for chunk in run_route_stream(robot, generate_route(20000), chunk_size=500):
+                if chunk.index == 1:
+                    tracemalloc.reset_peak()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        self.assertEqual(20000, chunk.total_commands)
+        self.assertLess(peak, 1000000)
@@ -0,0 +1,140 @@
+import time
+from unittest import TestCase
+from unittest.mock import Mock
+
+from src.backends import SimulatedBackend, SimulatedGPIO, SimulatedIBS
+from src.cleaning_robot import CleaningRobot
+from src.sensor_sampler import SampleRing, SensorSampler
+
+
+class TestSampleRing(TestCase):
+
+    def test_latest_sample(self):
+        ring = SampleRing(2)
+        self.assertIsNone(ring.latest())
+        for value in range(5):
+            ring.append(value, value * 0.5, value)
+        self.assertEqual((4.0, 2.0, 4), ring.latest())
+        self.assertEqual(5, ring.head)
+
+
+class TestSensorSampler(TestCase):
+
+    def test_stale_samples_are_not_used(self):
+        gpio = SimulatedGPIO()
+        now = Mock(return_value=10.0)
+        sampler = SensorSampler(gpio, SimulatedIBS(80), CleaningRobot.INFRARED_PIN, max_infrared_age=0.1,
+                                max_battery_age=2.0, clock=now)
+        self.assertIsNone(sampler.latest_infrared())
+        gpio.set_input(CleaningRobot.INFRARED_PIN, True)
+        sampler.sample_infrared()
+        sampler.sample_battery()
+        self.assertTrue(sampler.latest_infrared())
+        self.assertEqual(80, sampler.latest_battery())
+        now.return_value = 11.0
+        self.assertIsNone(sampler.latest_infrared())
+        self.assertEqual(80, sampler.latest_battery())
+        self.assertEqual({"infrared": 2, "battery": 0}, sampler.stale_reads)
+
+    def test_background_sampling_rates(self):
+        sampler = SensorSampler(SimulatedGPIO(), SimulatedIBS(), CleaningRobot.INFRARED_PIN, infrared_rate=200,
+                                battery_rate=20)
+        sampler.start()
+        time.sleep(0.2)
+        sampler.stop()
+        stats = sampler.stats()
+        self.assertGreater(stats["infrared_samples"], stats["battery_samples"])
+        self.assertGreater(stats["battery_samples"], 0)
+        self.assertLessEqual(stats["infrared_rate"], 250)
+        self.assertIsNone(sampler.thread)
+
+    def test_robot_reads_samples(self):
+        backend = SimulatedBackend(charge=60)
+        robot = CleaningRobot(backend)
+        robot.initialize_robot()
+        sampler = robot.enable_sensor_sampler(infrared_rate=1000, battery_rate=0.01, max_infrared_age=1.0,
+                                              max_battery_age=60.0)
+        try:
+            self.assertIsNone(sampler.thread)
+            self.assertEqual(["(0,1,N)", "(0,1,E)", "(1,1,E)"], robot.execute_commands("frf", battery_check_interval=1))
+            robot.manage_cleaning_system()
+            self.assertTrue(robot.cleaning_system_on)
+            ##Only the sampler thread read the IBS
+            self.assertEqual(1, backend.ibs.reads)
+
+            backend.gpio.set_input(robot.INFRARED_PIN, True)
+            ##The sampler runs on the robot's virtual clock: let some time pass for it to take a new sample
+            robot.clock.sleep(0.01)
+            self.assertEqual("(1,1,E)(2,1)", robot.execute_command(robot.FORWARD))
+        finally:
+            robot.disable_sensor_sampler()
+        self.assertIs(backend.ibs, robot.battery.ibs)
+        self.assertIsNone(robot.sensor_sampler)
+
+    def test_samples_are_stale_after_rotation(self):
+        backend = SimulatedBackend()
+        robot = CleaningRobot(backend)
+        robot.initialize_robot()
+        backend.gpio.set_input_source(robot.INFRARED_PIN, lambda: robot.heading == robot.E)
+        robot.enable_sensor_sampler()
+        try:
+            self.assertEqual(["(0,0,E)", "(0,0,E)(1,0)"], robot.execute_commands("rf"))
+        finally:
+            robot.disable_sensor_sampler()
+
+    def test_sampling_follows_virtual_clock(self):
+        robot = CleaningRobot(SimulatedBackend())
+        robot.initialize_robot()
+        sampler = robot.enable_sensor_sampler(infrared_rate=100, battery_rate=2)
+        robot.clock.sleep(10)
+        stats = sampler.stats()
+        self.assertEqual(1001, stats["infrared_samples"])
+        self.assertEqual(21, stats["battery_samples"])
+        robot.disable_sensor_sampler()
+        robot.clock.sleep(10)
+        self.assertEqual(1001, sampler.infrared.head)
+
+    def test_ibs_latency_only_for_bus_reads(self):
+        robot = CleaningRobot(SimulatedBackend())
+        robot.initialize_robot()
+        robot.enable_sensor_sampler(max_battery_age=60.0)
+        robot.execute_commands("ffrf", battery_check_interval=1)
+        ##Every charge came from a sample taken in the background
+        self.assertNotIn("ibs", robot.clock.busy)
+        self.assertIsNone(robot.battery.on_read)
+        robot.disable_sensor_sampler()
+        robot.execute_command(robot.FORWARD)
+        self.assertIn("ibs", robot.clock.busy)
+
+    def test_stale_battery_read_holds_bus_lock(self):
+        backend = SimulatedBackend()
+        robot = CleaningRobot(backend)
+        robot.initialize_robot()
+        sampler = robot.enable_sensor_sampler(max_battery_age=0.0)
+        locked = []
+        backend.ibs.get_charge_left = lambda: locked.append(sampler.bus_lock.locked()) or 100
+        robot.execute_command(robot.FORWARD)
+        robot.disable_sensor_sampler()
+        self.assertTrue(locked)
+        self.assertTrue(all(locked))
+
+    def test_robot_falls_back_to_sensor_when_stale(self):
+        backend = SimulatedBackend(charge=60)
+        robot = CleaningRobot(backend)
+        robot.initialize_robot()
+        robot.sensor_sampler = SensorSampler(backend.gpio, backend.ibs, robot.INFRARED_PIN).attach(robot)
+        self.assertEqual("(0,1,N)", robot.execute_command(robot.FORWARD))
+        self.assertEqual(1, backend.ibs.reads)
+        self.assertEqual({"infrared": 1, "battery": 1}, robot.sensor_sampler.stale_reads)
+
+    def test_disable_keeps_other_wrappers(self):
+        backend = SimulatedBackend()
+        robot = CleaningRobot(backend)
+        robot.initialize_robot()
+        robot.enable_sensor_sampler()
+        instrumentation = robot.enable_instrumentation()
+        robot.disable_sensor_sampler()
+        self.assertIs(instrumentation.ibs, robot.battery.ibs)
+        self.assertIs(backend.ibs, robot.battery.ibs.ibs)
+        robot.disable_instrumentation()
+        self.assertIs(backend.ibs, robot.battery.ibs)
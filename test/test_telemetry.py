@@ -0,0 +1,53 @@
+from unittest import TestCase
+
+from src.backends import SimulatedBackend
+from src.cleaning_robot import CleaningRobot, CleaningRobotError
+from src.telemetry import RECORD, TelemetryBuffer, format_status, pack_status, unpack_status
+
+
+class TestTelemetry(TestCase):
+
+    def create_robot(self) -> CleaningRobot:
+        backend = SimulatedBackend(charge=80)
+        backend.gpio.script_input(CleaningRobot.INFRARED_PIN, [False, True])
+        robot = CleaningRobot(backend)
+        robot.initialize_robot()
+        return robot
+
+    def test_pack_unpack_status(self):
+        robot = self.create_robot()
+        robot.execute_commands("rf")
+        robot.manage_cleaning_system()
+        record = unpack_status(pack_status(robot))
+        self.assertEqual(RECORD.size, len(pack_status(robot)))
+        self.assertEqual((1, 0, "E", False, False, True, False, 80), record)
+
+    def test_format_status_matches_robot_status(self):
+        robot = self.create_robot()
+        for command in "frf":
+            result = robot.execute_command(command)
+            self.assertEqual(result, format_status(unpack_status(pack_status(robot)), with_obstacle=True))
+        self.assertEqual(robot.robot_status(), format_status(unpack_status(pack_status(robot))))
+
+    def test_format_status_after_rotation_following_obstacle(self):
+        robot = self.create_robot()
+        for command in "ffr":
+            result = robot.execute_command(command)
+            self.assertEqual(result, format_status(unpack_status(pack_status(robot)), with_obstacle=True))
+        self.assertEqual("(0,1,E)", result)
+
+    def test_uninitialized_robot(self):
+        robot = CleaningRobot(SimulatedBackend())
+        record = unpack_status(pack_status(robot))
+        self.assertIsNone(record.heading)
+        self.assertIsNone(record.battery)
+
+    def test_telemetry_buffer(self):
+        robot = self.create_robot()
+        buffer = TelemetryBuffer(2)
+        buffer.append(robot)
+        robot.execute_command(robot.FORWARD)
+        buffer.append(robot)
+        self.assertEqual(2 * RECORD.size, len(buffer.view()))
+        self.assertEqual([(0, 0), (0, 1)], [(record.x, record.y) for record in buffer.records()])
+        self.assertRaises(CleaningRobotError, buffer.append, robot)